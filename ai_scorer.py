@@ -0,0 +1,398 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import torch
+from inference_backends import make_backend
+from metrics import METRICS
+from preprocess import to_pixel_values
+# 모델 이름, 점수 기준, 점수 계산은 torch 없이 쓸 수 있도록 scoring.py에 있음 (기존 import 경로도 그대로 사용 가능)
+from scoring import (GREAT_SCORE, MIN_SCORE, MODEL_NAME, PASS_SCORE, TEXT_PENALTY_THRESHOLD, compute_score,
+                     score_tier)
+
+# ====== 텍스트 임베딩 저장 위치 ======
+CACHE_DIR = "cache"
+# 저장 파일 형식이 바뀌면 올려서 예전 파일을 무시하게 함
+INDEX_VERSION = 2
+TEXT_ENCODE_BATCH = 256  # 텍스트 임베딩을 처음 만들 때 한 번에 인코딩하는 프롬프트 수
+
+# ====== 같은 그림 재채점 캐시 (개수와 용량 중 먼저 넘는 쪽에서 오래된 항목부터 버림) ======
+RESULT_CACHE_ENTRIES = 512
+RESULT_CACHE_BYTES = 4 * 1024 * 1024
+
+# ====== 채점용 프롬프트 ======
+# [0] 그림, [1] 정답 단어 글씨(함정) -> 단어마다 달라지는 프롬프트
+WORD_TEMPLATES = [
+    "a sketch of a {}",
+    "the written word '{}'"
+]
+# [2-3] 일반 글씨, [4-5] 무의미 -> 단어와 상관없이 항상 같은 프롬프트
+FIXED_PROMPTS = [
+    "written text",
+    "handwriting and letters",
+    "messy scribbles",
+    "blank white paper"
+]
+# PROMPT_MAP에 없는 단어가 나왔을 때 사용하는 단어
+DEFAULT_WORD = "object"
+
+# ====== [0] 그림 프롬프트 앙상블 ======
+# 여러 템플릿의 임베딩을 평균 내서 단어마다 한 줄로 미리 합쳐둠 (채점할 때 드는 시간은 그대로)
+# 기본값은 기존 프롬프트 하나 (점수 기준이 바뀌지 않도록), 바꾸기 전에 parity.py로 판정 변화를 확인
+SKETCH_TEMPLATES = WORD_TEMPLATES[:1]
+ENSEMBLE_TEMPLATES = [
+    "a sketch of a {}",
+    "a child's drawing of a {}",
+    "a doodle of a {}",
+    "a simple line drawing of a {}"
+]
+
+# ====== 전체 제시어 중 "만디가 생각한 것" ======
+TOP_K = 3  # 보여줄 후보 수
+
+# ====== 워밍업 ======
+# 모델을 불러온 직후 가짜 그림으로 채점 경로를 미리 돌려서, 첫 채점 때 생기는 초기화
+# (메모리 할당, 연산 커널 선택, 전처리기 준비 등)를 아이가 기다리기 전에 치러 둠
+WARMUP_ROUNDS = 2
+
+
+class TextEmbeddingStore:
+    # 모든 단어 x 모든 프롬프트의 텍스트 임베딩을 한 번만 계산해서 보관
+    # 계산 결과는 디스크에 저장해두고, 다음 실행부터는 파일을 메모리 맵으로 바로 연결
+    # templates: [0] 그림 프롬프트 템플릿 목록, 또는 단어별 {단어: 템플릿 목록} ("*"는 나머지 단어 기본값)
+    def __init__(self, model, processor, words, model_name=MODEL_NAME, cache_dir=CACHE_DIR, templates=None):
+        self.vocab = sorted(set(words))  # 전체 단어 순위를 매길 때 쓰는 후보 (DEFAULT_WORD 제외)
+        meta = index_meta(words, model_name, templates)
+        self.words = meta["words"]
+        self.index = {word: i for i, word in enumerate(self.words)}
+        self.sketch_templates = meta["sketch_templates"]
+        self.path = index_path(cache_dir, meta)
+
+        embeds = load_index(self.path, meta)
+        if embeds is None:
+            embeds = self.encode_all(model, processor).numpy()
+            save_index(self.path, meta, embeds)
+        embeds = torch.from_numpy(embeds)
+
+        # word_embeds: (단어 수, 템플릿 수, 차원), fixed_embeds: (고정 프롬프트 수, 차원)
+        num_word_prompts = len(self.words) * len(WORD_TEMPLATES)
+        self.word_embeds = embeds[:num_word_prompts].reshape(len(self.words), len(WORD_TEMPLATES), -1)
+        self.fixed_embeds = embeds[num_word_prompts:]
+
+        # class_embeds: 후보 단어마다 그림 프롬프트([0]) 임베딩 한 줄 (후보 수, 차원)
+        self.vocab_index = {word: i for i, word in enumerate(self.vocab)}
+        rows = torch.tensor([self.index[word] for word in self.vocab], dtype=torch.long)
+        self.class_embeds = self.word_embeds[rows, 0].contiguous()
+
+    def encode_all(self, model, processor):
+        # 단어마다 [그림 템플릿들..., 글씨 템플릿...] 순서로 한꺼번에 인코딩한 뒤
+        # 그림 템플릿 임베딩은 평균 내서 한 줄로 합침 -> (단어 수 x 템플릿 수 + 고정 프롬프트 수, 차원)
+        prompts = []
+        for word, sketch in zip(self.words, self.sketch_templates):
+            prompts += [template.format(word) for template in sketch]
+            prompts += [template.format(word) for template in WORD_TEMPLATES[1:]]
+        prompts += FIXED_PROMPTS
+        encoded = torch.cat([encode_text(model, processor, prompts[i:i + TEXT_ENCODE_BATCH])
+                             for i in range(0, len(prompts), TEXT_ENCODE_BATCH)])
+
+        rows = []
+        start = 0
+        for sketch in self.sketch_templates:
+            sketch_embed = encoded[start:start + len(sketch)].mean(dim=0)
+            if len(sketch) > 1:
+                sketch_embed = sketch_embed / sketch_embed.norm()
+            start += len(sketch)
+            rows.append(sketch_embed)
+            rows.extend(encoded[start:start + len(WORD_TEMPLATES) - 1])
+            start += len(WORD_TEMPLATES) - 1
+        rows.extend(encoded[start:])
+        return torch.stack(rows)
+
+    def prompt_matrix(self, word_en):
+        # 기존 text_prompts 6개와 같은 순서의 (6, 차원) 행렬
+        i = self.index.get(word_en)
+        if i is None:
+            i = self.index[DEFAULT_WORD]
+        return torch.cat([self.word_embeds[i], self.fixed_embeds], dim=0)
+
+
+def sketch_templates_for(word, templates=None):
+    if templates is None:
+        return list(SKETCH_TEMPLATES)
+    if isinstance(templates, dict):
+        return list(templates.get(word) or templates.get("*") or SKETCH_TEMPLATES)
+    return list(templates)
+
+
+def load_templates(spec):
+    # spec: 없음(기본 템플릿 하나), "ensemble"(ENSEMBLE_TEMPLATES), 또는 JSON 파일 경로
+    # JSON 파일은 템플릿 목록 ["a doodle of a {}", ...] 또는 단어별 {"*": [...], "cat": [...]}
+    if not spec:
+        return None
+    if spec == "ensemble":
+        return ENSEMBLE_TEMPLATES
+    with open(spec, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ====== 텍스트 임베딩 파일 (모델 이름 + 프롬프트 + 단어 목록의 해시로 구분) ======
+def index_meta(words, model_name=MODEL_NAME, templates=None):
+    words = sorted(set(words) | {DEFAULT_WORD})
+    return {
+        "version": INDEX_VERSION,
+        "model": model_name,
+        "word_templates": WORD_TEMPLATES,
+        "sketch_templates": [sketch_templates_for(word, templates) for word in words],
+        "fixed_prompts": FIXED_PROMPTS,
+        "words": words
+    }
+
+
+def index_path(cache_dir, meta):
+    digest = hashlib.sha1(json.dumps(meta, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    model_slug = meta["model"].replace("/", "_")
+    return os.path.join(cache_dir, f"text_embeds_{model_slug}_v{meta['version']}_{digest}.npy")
+
+
+def load_index(path, meta):
+    try:
+        with open(path + ".json", encoding="utf-8") as f:
+            if json.load(f) != meta:
+                return None
+        # mmap_mode="c": 파일을 읽지 않고 페이지 단위로 연결 (수정해도 파일에는 반영 안 됨)
+        return np.load(path, mmap_mode="c")
+    except (OSError, ValueError):
+        return None
+
+
+def save_index(path, meta, embeds):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 임시 파일에 쓴 뒤 교체해서, 저장 도중 꺼져도 깨진 파일이 남지 않게 함
+        # (임시 파일 이름에 pid를 붙여 여러 프로세스가 동시에 만들어도 서로 덮어쓰지 않게 함)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        np.save(tmp + ".npy", embeds.astype(np.float32))
+        os.replace(tmp + ".npy", path)
+        with open(tmp + ".json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp + ".json", path + ".json")
+    except OSError as e:
+        print(f"텍스트 임베딩 저장 실패: {e}")
+
+
+def encode_text(model, processor, prompts):
+    # 텍스트 임베딩은 미리 계산하므로 토큰화는 인덱스를 만들 때만 일어남
+    with METRICS.timer("tokenize"):
+        inputs = processor(text=prompts, return_tensors="pt", padding=True)
+    with torch.no_grad():
+        text_out = model.text_model(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"])
+        embeds = model.text_projection(text_out.pooler_output)
+    return embeds / embeds.norm(dim=-1, keepdim=True)
+
+
+class ResultCache:
+    # 그림 해시 -> 이미지 임베딩, (그림 해시, 제시어) -> 확률 을 저장하는 LRU 캐시
+    def __init__(self, max_entries=RESULT_CACHE_ENTRIES, max_bytes=RESULT_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (값, 크기)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size):
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (value, size)
+            self.bytes += size
+            while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+                self.bytes -= self.entries.popitem(last=False)[1][1]
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries), "bytes": self.bytes}
+
+
+def image_key(image):
+    # 래스터화된 그림의 바이트 해시 (크기와 모드도 같이 넣어서 구분)
+    digest = hashlib.blake2b(image.tobytes(), digest_size=16)
+    digest.update(f"{image.mode}{image.size}".encode("ascii"))
+    return digest.hexdigest()
+
+
+class ClipScorer:
+    # 텍스트 임베딩은 미리 계산해두고, 채점할 때는 이미지 인코더 + 내적만 수행
+    # backend: 이미지 인코더 실행 방식 ("torch", "int8", "onnx")
+    # preprocess: "crop" (224x224로 미리 맞춘 그림을 NumPy로 바로 정규화) 또는 "processor" (기존 CLIPProcessor)
+    # templates: [0] 그림 프롬프트 앙상블 (TextEmbeddingStore 참고, 없으면 기존 프롬프트 하나)
+    # threads, interop: onnx 백엔드의 ONNX Runtime 스레드 수 (thread_tuning.onnx_threads 참고)
+    def __init__(self, model, processor, words, model_name=MODEL_NAME, backend="torch", cache_dir=CACHE_DIR,
+                 preprocess="crop", cache=True, templates=None, threads=None, interop=None):
+        self.model = model
+        self.processor = processor
+        self.preprocess = preprocess
+        self.cache = ResultCache() if cache else None
+        self.text_store = TextEmbeddingStore(model, processor, words, model_name, cache_dir, templates)
+        self.backend = make_backend(backend, model, model_name, cache_dir, threads, interop)
+        self.logit_scale = model.logit_scale.exp().item()
+        self.encoded = False  # 한 번이라도 이미지를 인코딩했는지 (첫 인코딩 시간은 따로 기록)
+
+    def image_embeds(self, images, keys=None):
+        # 캐시에 있는 그림은 건너뛰고 나머지만 한 번에 인코딩
+        if self.cache is None:
+            return self.encode_images(images)
+        if keys is None:
+            keys = [image_key(image) for image in images]
+
+        embeds = [self.cache.get(("embed", key)) for key in keys]
+        missing = [i for i, embed in enumerate(embeds) if embed is None]
+        if missing:
+            computed = self.encode_images([images[i] for i in missing])
+            for i, embed in zip(missing, computed):
+                embed = embed.clone()  # 배치 전체 텐서를 붙잡고 있지 않도록 복사
+                embeds[i] = embed
+                self.cache.put(("embed", keys[i]), embed, embed.numel() * embed.element_size())
+        return torch.stack(embeds)
+
+    def encode_images(self, images):
+        start = time.perf_counter()
+        with METRICS.timer("preprocess"):
+            if self.preprocess == "crop":
+                pixel_values = to_pixel_values(images)
+            else:
+                pixel_values = self.processor(images=images, return_tensors="pt")["pixel_values"]
+        with METRICS.timer("forward"):
+            embeds = self.backend.image_features(pixel_values)
+            embeds = embeds / embeds.norm(dim=-1, keepdim=True)
+        METRICS.increment("images_encoded", len(images))
+        # 첫 인코딩(초기화 비용 포함)과 그 뒤를 따로 기록 -> 워밍업을 하면 아이가 받는 첫 채점도 warm 쪽에 들어감
+        METRICS.observe("encode_warm" if self.encoded else "encode_cold", (time.perf_counter() - start) * 1000)
+        self.encoded = True
+        return embeds
+
+    def warm_up(self, words_en=(DEFAULT_WORD,), rounds=WARMUP_ROUNDS):
+        # 합성 그림으로 전처리 -> 이미지 인코더 -> 점수 -> 단어 순위까지 실제 채점과 같은 경로를 실행
+        # 결과 캐시는 거치지 않음 (매번 모델을 통과해야 하고, 가짜 그림이 캐시에 남지 않게)
+        # -> 회차별 걸린 시간(ms) 목록
+        from synthetic import make_sketch
+
+        images = []
+        for word in words_en:
+            strokes = make_sketch(word)
+            images.append(strokes.render_square() if self.preprocess == "crop" else strokes.render_full())
+
+        times = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            image_embeds = self.encode_images(images)
+            self.compute_probs(image_embeds, list(words_en))
+            self.rank_words(image_embeds, list(words_en))
+            times.append((time.perf_counter() - start) * 1000)
+            METRICS.observe("warmup", times[-1])
+        return times
+
+    def predict_probs(self, image, word_en):
+        # model(**inputs).logits_per_image.softmax(dim=1)[0] 와 같은 값 (6개 확률 리스트)
+        return self.predict_probs_batch([image], [word_en])[0]
+
+    def predict_probs_batch(self, images, words_en):
+        # 여러 그림을 이미지 인코더에 한 번에 통과시키고, 그림마다 자기 제시어의 프롬프트와 비교
+        if self.cache is None:
+            return self.compute_probs(self.image_embeds(images), words_en)
+
+        keys = [image_key(image) for image in images]
+        results = [self.cache.get(("probs", key, word)) for key, word in zip(keys, words_en)]
+        missing = [i for i, probs in enumerate(results) if probs is None]
+        if missing:
+            image_embeds = self.image_embeds([images[i] for i in missing], [keys[i] for i in missing])
+            computed = self.compute_probs(image_embeds, [words_en[i] for i in missing])
+            for i, probs in zip(missing, computed):
+                results[i] = probs
+                self.cache.put(("probs", keys[i], words_en[i]), probs, 8 * len(probs))
+        return results
+
+    def predict_with_guesses(self, image, word_en, k=TOP_K):
+        # 점수용 확률 + 전체 제시어 중 상위 k개 (이미지 인코딩은 한 번)
+        return self.predict_with_guesses_batch([image], [word_en], k)[0]
+
+    def predict_with_guesses_batch(self, images, words_en, k=TOP_K):
+        image_embeds = self.image_embeds(images)
+        return list(zip(self.compute_probs(image_embeds, words_en), self.rank_words(image_embeds, words_en, k)))
+
+    def rank_words(self, image_embeds, words_en, k=TOP_K):
+        # 그림 임베딩 (배치, 차원) x 후보 단어 (후보 수, 차원) 행렬 곱 한 번으로 모든 단어 점수 계산
+        # -> 그림마다 {"top": [(단어, 확률), ...], "rank": 제시어 순위 (1부터, 후보에 없으면 None), "total": 후보 수}
+        store = self.text_store
+        with METRICS.timer("rank_words"):
+            logits = self.logit_scale * image_embeds @ store.class_embeds.T
+            probs = logits.softmax(dim=1)
+            top_probs, top_index = probs.topk(min(k, len(store.vocab)), dim=1)
+
+            guesses = []
+            for row, word, values, indices in zip(logits, words_en, top_probs.tolist(), top_index.tolist()):
+                target = store.vocab_index.get(word)
+                rank = None if target is None else int((row > row[target]).sum()) + 1
+                guesses.append({"top": [(store.vocab[i], p) for i, p in zip(indices, values)], "rank": rank,
+                                "total": len(store.vocab)})
+        return guesses
+
+    def compute_probs(self, image_embeds, words_en):
+        with METRICS.timer("postprocess"):
+            matrices = torch.stack([self.text_store.prompt_matrix(word) for word in words_en])
+            logits = self.logit_scale * torch.einsum("bpd,bd->bp", matrices, image_embeds)
+            return logits.softmax(dim=1).tolist()
+
+
+def load_scorer(model_name=MODEL_NAME, backend="torch", preprocess="crop", cache_dir=CACHE_DIR, words=None,
+                cache=True, templates=None, threads=None, interop=None):
+    # GUI 밖(서버, 일괄 채점 등)에서 쓰는 채점기 생성
+    # threads, interop: onnx 백엔드의 ONNX Runtime 스레드 수 (torch 백엔드는 torch.set_num_threads로 따로 정함)
+    from transformers import CLIPProcessor, CLIPModel
+    from prompts import PROMPT_MAP
+
+    model = CLIPModel.from_pretrained(model_name)
+    processor = CLIPProcessor.from_pretrained(model_name)
+    if words is None:
+        words = PROMPT_MAP.values()
+    return ClipScorer(model, processor, words, model_name, backend, cache_dir, preprocess, cache, templates, threads,
+                      interop)
+
+
+def prepare_cache(model_name=MODEL_NAME, backend="torch", cache_dir=CACHE_DIR, words=None, templates=None):
+    # 여러 프로세스가 같은 캐시 파일(텍스트 임베딩, ONNX 모델)을 동시에 만들지 않도록 부모 프로세스에서 미리 만듦
+    # 이미 다 있으면 모델을 불러오지 않음
+    from inference_backends import export_onnx, onnx_path
+
+    if words is None:
+        from prompts import PROMPT_MAP
+
+        words = PROMPT_MAP.values()
+    words = list(words)
+    meta = index_meta(words, model_name, templates)
+    need_index = load_index(index_path(cache_dir, meta), meta) is None
+    need_onnx = backend == "onnx" and not os.path.exists(onnx_path(cache_dir, model_name))
+    if not (need_index or need_onnx):
+        return
+
+    from transformers import CLIPProcessor, CLIPModel
+
+    model = CLIPModel.from_pretrained(model_name)
+    if need_index:
+        TextEmbeddingStore(model, CLIPProcessor.from_pretrained(model_name), words, model_name, cache_dir, templates)
+    if need_onnx:
+        export_onnx(model, onnx_path(cache_dir, model_name))
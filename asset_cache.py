@@ -0,0 +1,63 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+# ====== 배경 이미지 캐시 설정 ======
+# 원본 JPG를 매번 열어서 줄이지 않고, 화면 크기로 줄인 RGB 픽셀을 그대로 저장해 두었다가 읽기만 함
+ASSET_CACHE_DIR = os.path.join("cache", "assets")
+ASSET_WORKERS = 2  # 이미지를 읽는 백그라운드 스레드 수
+
+
+def asset_cache_path(path, size, cache_dir=ASSET_CACHE_DIR):
+    # 원본 경로, 수정 시각, 목표 크기가 하나라도 바뀌면 다른 파일이 됨
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{size[0]}x{size[1]}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{name}_{size[0]}x{size[1]}_{digest}.rgb")
+
+
+def load_image(path, size, cache_dir=ASSET_CACHE_DIR):
+    # size 크기로 줄인 RGB 이미지 (캐시가 있으면 디코딩, 리사이즈 없이 바로 읽음)
+    # 원본이 없거나 읽을 수 없으면 OSError
+    cache_path = asset_cache_path(path, size, cache_dir)
+    try:
+        with open(cache_path, "rb") as f:
+            data = f.read()
+        if len(data) == size[0] * size[1] * 3:
+            return Image.frombytes("RGB", size, data)
+    except OSError:
+        pass
+
+    with Image.open(path) as source:
+        image = source.convert("RGB").resize(size)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(image.tobytes())
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # 캐시를 못 써도 이미지는 그대로 사용
+    return image
+
+
+class AssetLoader:
+    # 이미지 읽기는 백그라운드 스레드에서, PhotoImage 만들기는 UI 스레드에서 (Tk는 메인 스레드 전용)
+    # 같은 이미지를 여러 번 요청해도 한 번만 읽음
+    def __init__(self, size, cache_dir=ASSET_CACHE_DIR, workers=ASSET_WORKERS):
+        self.size = size
+        self.cache_dir = cache_dir
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assets")
+        self.futures = {}
+
+    def request(self, path):
+        # path 이미지를 읽기 시작하고 Future(PIL 이미지)를 돌려줌
+        if path not in self.futures:
+            self.futures[path] = self.executor.submit(load_image, path, self.size, self.cache_dir)
+        return self.futures[path]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
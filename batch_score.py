@@ -0,0 +1,223 @@
+import argparse
+import csv
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from ai_scorer import compute_score, load_scorer, load_templates, prepare_cache, DEFAULT_WORD
+from preprocess import ink_bbox, letterbox
+from prompts import PROMPT_MAP
+
+# ====== 일괄 채점 설정 ======
+# 저장해 둔 그림 파일들을 GUI 없이 다시 채점 (점수 기준이 바뀌었을 때 재채점용)
+BATCH_SIZE = 32
+PREFETCH_BATCHES = 2  # 채점하는 동안 미리 읽어둘 배치 수
+RESULT_COLUMNS = ["file", "word", "score", "prob_drawing", "text_prob", "penalized"]
+SHARD_BATCHES = 4  # 여러 프로세스로 나눌 때 작업 하나에 들어가는 배치 수
+
+
+def to_english(word):
+    # 라벨은 게임 제시어(한국어) 또는 영어 단어 모두 허용
+    if word in PROMPT_MAP:
+        return PROMPT_MAP[word]
+    if word in PROMPT_MAP.values():
+        return word
+    return DEFAULT_WORD
+
+
+def prepare_image(image, preprocess):
+    # 게임의 crop 모드와 같게, 선이 있는 영역만 잘라 224x224로 맞춤
+    image = image.convert("RGB")
+    if preprocess == "crop":
+        return letterbox(image, ink_bbox(image))
+    return image
+
+
+def score_batch(images, target_words, scorer=None):
+    # images: PIL 이미지 목록(그림 파일 그대로), target_words: 제시어 목록 -> 그림마다 점수 결과 dict
+    # CLI, 게임과 같은 전처리(crop이면 선이 있는 영역만 잘라 224x224)를 거친 뒤 채점
+    if scorer is None:
+        scorer = load_scorer()
+    return score_prepared([prepare_image(image, scorer.preprocess) for image in images], target_words, scorer)
+
+
+def score_prepared(images, target_words, scorer):
+    # prepare_image를 이미 거친 이미지 (읽기 스레드에서 미리 전처리한 배치)
+    words_en = [to_english(word) for word in target_words]
+    results = []
+    for probs in scorer.predict_probs_batch(list(images), words_en):
+        score, text_prob, penalized = compute_score(probs)
+        results.append({"score": score, "prob_drawing": probs[0], "text_prob": text_prob, "penalized": penalized})
+    return results
+
+
+# ====== 파일 읽기 ======
+def load_labels(path):
+    # CSV 형식: file,word (첫 줄은 머리글)
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return [(row["file"], row["word"]) for row in csv.DictReader(f)]
+
+
+def iter_batches(image_dir, labels, batch_size=BATCH_SIZE, prefetch=PREFETCH_BATCHES, preprocess="crop"):
+    # 별도 스레드가 그림을 읽고 전처리해서 큐에 넣어두면, 채점 쪽은 꺼내 쓰기만 함 (DataLoader 방식)
+    batches = queue.Queue(maxsize=max(1, prefetch))
+    done = object()
+
+    def load():
+        batch = []
+        try:
+            for name, word in labels:
+                try:
+                    with Image.open(os.path.join(image_dir, name)) as image:
+                        batch.append((name, word, prepare_image(image, preprocess)))
+                except OSError as e:
+                    print(f"{name}를 읽을 수 없습니다: {e}")
+                    continue
+                if len(batch) == batch_size:
+                    batches.put(batch)
+                    batch = []
+            if batch:
+                batches.put(batch)
+        except Exception as e:
+            # 그 밖의 오류(DecompressionBombError 등)는 채점 쪽에 넘겨서 다시 발생시킴
+            # (읽기 스레드만 조용히 죽으면 채점 쪽이 batches.get()에서 영원히 기다림)
+            batches.put(e)
+        finally:
+            batches.put(done)
+
+    threading.Thread(target=load, daemon=True).start()
+    while True:
+        batch = batches.get()
+        if batch is done:
+            return
+        if isinstance(batch, Exception):
+            raise batch
+        yield batch
+
+
+def score_directory(image_dir, labels, scorer, batch_size=BATCH_SIZE, prefetch=PREFETCH_BATCHES,
+                    preprocess="crop"):
+    for batch in iter_batches(image_dir, labels, batch_size, prefetch, preprocess):
+        names, words, images = zip(*batch)
+        for name, word, result in zip(names, words, score_prepared(images, words, scorer)):
+            yield {"file": name, "word": word, **result}
+
+
+# ====== 여러 프로세스로 나눠 채점 ======
+worker_scorer = None
+worker_options = None
+
+
+def init_worker(cache_options, preprocess, threads, batch_size, prefetch):
+    # 프로세스마다 모델을 한 번만 불러옴 (텍스트 임베딩, ONNX 파일은 부모가 미리 만들어 두었으므로 동시에 로딩)
+    global worker_scorer, worker_options
+    import torch
+
+    # 프로세스끼리 CPU 코어를 나눠 쓰도록 제한 (onnx는 torch 설정을 따르지 않으므로 세션 옵션으로 따로)
+    torch.set_num_threads(threads)
+    worker_scorer = load_scorer(preprocess=preprocess, cache=False, threads=threads, interop=1, **cache_options)
+    worker_options = (batch_size, prefetch, preprocess)
+
+
+def score_shard(image_dir, shard):
+    batch_size, prefetch, preprocess = worker_options
+    return list(score_directory(image_dir, shard, worker_scorer, batch_size, prefetch, preprocess))
+
+
+def score_parallel(image_dir, labels, workers, threads_per_worker=None, backend="torch", preprocess="crop",
+                   batch_size=BATCH_SIZE, prefetch=PREFETCH_BATCHES, templates=None):
+    # 라벨을 작업 단위(shard)로 나눠 프로세스들에 보내고, 결과는 원래 순서대로 돌려줌
+    if threads_per_worker is None:
+        threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    shard_size = batch_size * SHARD_BATCHES
+    shards = [labels[i:i + shard_size] for i in range(0, len(labels), shard_size)]
+
+    # 텍스트 임베딩은 디스크 파일을 메모리 맵으로 같이 쓰므로, 프로세스들이 동시에 만들지 않게 여기서 한 번 만듦
+    # (프로세스들이 부모가 만든 캐시를 그대로 찾도록 같은 설정을 넘김)
+    cache_options = {"backend": backend, "templates": templates}
+    prepare_cache(**cache_options)
+    initargs = (cache_options, preprocess, threads_per_worker, batch_size, prefetch)
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=initargs) as executor:
+        for rows in executor.map(score_shard, [image_dir] * len(shards), shards):
+            yield from rows
+
+
+# ====== 결과 저장 (중간 저장 파일에서 이어서 채점 가능) ======
+def checkpoint_path(output):
+    # CSV 결과는 그 파일 자체가 중간 저장 파일, Parquet는 옆에 CSV를 따로 둠
+    if output.endswith(".parquet"):
+        return output + ".partial.csv"
+    return output
+
+
+def read_checkpoint(path):
+    # 이미 채점한 파일 이름 목록
+    if not os.path.exists(path):
+        return set()
+    with open(path, newline="", encoding="utf-8") as f:
+        return {row["file"] for row in csv.DictReader(f)}
+
+
+def write_csv(rows, path, append=False):
+    # 한 줄씩 바로 써서, 중간에 멈춰도 그때까지의 결과는 남게 함
+    count = 0
+    with open(path, "a" if append else "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+        if not append:
+            writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            f.flush()
+            count += 1
+    return count
+
+
+def csv_to_parquet(csv_path, path):
+    try:
+        import pandas as pd
+    except ImportError:
+        raise SystemExit("Parquet로 저장하려면 pandas와 pyarrow를 설치해야 합니다. (pip install pandas pyarrow)")
+    pd.read_csv(csv_path).to_parquet(path, index=False)
+    os.remove(csv_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="저장된 그림 파일들을 한 번에 다시 채점")
+    parser.add_argument("image_dir", help="그림(PNG) 폴더")
+    parser.add_argument("labels", help="라벨 CSV (file,word)")
+    parser.add_argument("-o", "--output", default="scores.csv", help="결과 파일 (.csv 또는 .parquet)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--prefetch", type=int, default=PREFETCH_BATCHES)
+    parser.add_argument("--backend", default="torch", help="torch, int8, onnx")
+    parser.add_argument("--preprocess", default="crop", choices=["crop", "processor"])
+    parser.add_argument("--workers", type=int, default=1, help="채점 프로세스 수 (2 이상이면 여러 프로세스로 나눠 채점)")
+    parser.add_argument("--threads-per-worker", type=int, default=None, help="프로세스당 스레드 수 (torch, ONNX Runtime)")
+    parser.add_argument("--resume", action="store_true", help="중간 저장된 결과가 있으면 이어서 채점")
+    parser.add_argument("--templates", default=None, help="그림 프롬프트 템플릿 (ensemble 또는 JSON 파일)")
+    args = parser.parse_args()
+
+    labels = load_labels(args.labels)
+    templates = load_templates(args.templates)
+    checkpoint = checkpoint_path(args.output)
+    done = read_checkpoint(checkpoint) if args.resume else set()
+    todo = [label for label in labels if label[0] not in done]
+    if done:
+        print(f"이미 채점한 {len(labels) - len(todo)}개는 건너뜁니다.")
+
+    print("AI 모델을 로딩 중입니다... 잠시만 기다려주세요.")
+    if args.workers > 1:
+        rows = score_parallel(args.image_dir, todo, args.workers, args.threads_per_worker, args.backend,
+                              args.preprocess, args.batch_size, args.prefetch, templates)
+    else:
+        scorer = load_scorer(backend=args.backend, preprocess=args.preprocess, cache=False, templates=templates)
+        rows = score_directory(args.image_dir, todo, scorer, args.batch_size, args.prefetch, args.preprocess)
+
+    count = write_csv(rows, checkpoint, append=bool(done))
+    if checkpoint != args.output:
+        csv_to_parquet(checkpoint, args.output)
+    print(f"채점 완료: {count}개 -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import time
+import numpy as np
+import torch
+from ai_scorer import CACHE_DIR, MODEL_NAME, ClipScorer
+from inference_backends import BACKEND_NAMES, make_backend
+from prompts import PROMPT_MAP
+from scoring import score_strokes
+from synthetic import CORPUS_VERSION, synthetic_corpus
+
+# ====== 벤치마크 설정 ======
+# 합성 그림 전체를 배치 크기, 스레드 수, 백엔드 조합마다 채점해서 지연 시간과 처리량을 잼
+BATCH_SIZES = [1, 4, 16]
+ROUNDS = 3  # 그림 전체를 몇 번 반복해서 잴지
+WARMUP_ROUNDS = 1  # 재지 않고 먼저 돌려보는 횟수 (첫 실행의 메모리 할당 등 제외)
+RESULT_VERSION = 2  # 결과 JSON 형식이 바뀌면 올림 (2: onnx도 스레드 수를 실제로 적용)
+
+
+def default_thread_counts():
+    cores = os.cpu_count() or 1
+    return sorted({1, max(1, cores // 2), cores})
+
+
+def score_drawings(scorer, drawings, preprocess="crop", guesses=True):
+    # 게임(calculate_ai_scores)과 같은 채점 함수로 여러 장을 한 번에
+    # guesses: 게임 기본값(SHOW_GUESSES)처럼 전체 제시어 순위(rank_words)까지 계산
+    # drawings: (이름, 제시어, StrokeStore) 목록 -> (점수, 글씨 확률) 목록
+    words_en = [PROMPT_MAP.get(word, "object") for _, word, _ in drawings]
+    results = score_strokes(scorer, [strokes for _, _, strokes in drawings], words_en, preprocess, guesses)
+    return [(result["score"], result["text_prob"]) for result in results]
+
+
+def measure(scorer, corpus, batch_size, rounds=ROUNDS, warmup=WARMUP_ROUNDS, preprocess="crop", guesses=True):
+    # 배치 하나를 채점하는 데 걸린 시간(ms) 목록과 전체 처리량
+    batches = [corpus[i:i + batch_size] for i in range(0, len(corpus), batch_size)]
+    for _ in range(warmup):
+        for batch in batches:
+            score_drawings(scorer, batch, preprocess, guesses)
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for batch in batches:
+            t0 = time.perf_counter()
+            score_drawings(scorer, batch, preprocess, guesses)
+            latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies)
+    return {
+        "batches": len(latencies),
+        "images": len(corpus) * rounds,
+        "mean_ms": round(float(latencies.mean()), 3),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "per_image_ms": round(elapsed * 1000 / (len(corpus) * rounds), 3),
+        "images_per_sec": round(len(corpus) * rounds / elapsed, 2)
+    }
+
+
+def run_benchmark(model, processor, corpus, backends=("torch",), thread_counts=None, batch_sizes=BATCH_SIZES,
+                  rounds=ROUNDS, warmup=WARMUP_ROUNDS, preprocess="crop", model_name=MODEL_NAME,
+                  cache_dir=CACHE_DIR, guesses=True):
+    # 백엔드 x 스레드 수 x 배치 크기 조합마다 한 줄씩 결과
+    # 같은 그림을 반복해서 채점하므로 결과 캐시는 끔 (켜면 두 번째부터 모델을 돌리지 않음)
+    # onnx는 torch 스레드 설정을 따르지 않으므로 스레드 수마다 ONNX Runtime 세션을 새로 만듦
+    if thread_counts is None:
+        thread_counts = default_thread_counts()
+    words = sorted({PROMPT_MAP.get(word, "object") for _, word, _ in corpus})
+
+    results = []
+    original_threads = torch.get_num_threads()
+    try:
+        for backend in backends:
+            scorer = ClipScorer(model, processor, words, model_name, backend, cache_dir, preprocess, cache=False)
+            for threads in thread_counts:
+                if backend == "onnx":
+                    scorer.backend = make_backend(backend, model, model_name, cache_dir, threads)
+                else:
+                    torch.set_num_threads(threads)
+                for batch_size in batch_sizes:
+                    result = {"backend": backend, "threads": threads, "batch_size": batch_size,
+                              "preprocess": preprocess, "guesses": guesses}
+                    result.update(measure(scorer, corpus, batch_size, rounds, warmup, preprocess, guesses))
+                    print(format_result(result))
+                    results.append(result)
+    finally:
+        torch.set_num_threads(original_threads)
+    return results
+
+
+def environment_info(model_name, corpus):
+    # 릴리스끼리 비교할 때 같은 조건인지 확인하는 용도
+    info = {
+        "version": RESULT_VERSION,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": socket.gethostname(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "model": model_name,
+        "corpus_version": CORPUS_VERSION,
+        "corpus_size": len(corpus)
+    }
+    for module in ("transformers", "onnxruntime"):
+        try:
+            info[module] = __import__(module).__version__
+        except ImportError:
+            info[module] = None
+    try:
+        info["commit"] = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                        cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        info["commit"] = None
+    return info
+
+
+def format_result(result):
+    return (f"[{result['backend']:>5} | 스레드 {result['threads']:2d} | 배치 {result['batch_size']:3d}] "
+            f"p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  p99 {result['p99_ms']:8.1f} ms  "
+            f"{result['images_per_sec']:7.1f} 장/초")
+
+
+def compare(old, new):
+    # 같은 조합끼리 처리량, p95를 비교 (1보다 크면 새 결과가 더 빠름)
+    key = lambda result: (result["backend"], result["threads"], result["batch_size"], result["preprocess"],
+                          result.get("guesses", False))
+    old_results = {key(result): result for result in old["results"]}
+    # 버전 1의 onnx 결과는 스레드 수와 상관없이 ONNX Runtime 기본값(모든 코어)으로 잰 것이므로 비교하지 않음
+    if old["environment"].get("version", 1) < 2:
+        old_results = {k: result for k, result in old_results.items() if result["backend"] != "onnx"}
+    print(f"비교: {old['environment'].get('commit')} -> {new['environment'].get('commit')}")
+    for result in new["results"]:
+        before = old_results.get(key(result))
+        if before is None:
+            continue
+        speedup = result["images_per_sec"] / before["images_per_sec"]
+        print(f"  {format_result(result)}  처리량 x{speedup:.2f}, p95 {before['p95_ms']:.1f} -> {result['p95_ms']:.1f} ms")
+
+
+def main():
+    from transformers import CLIPProcessor, CLIPModel
+
+    parser = argparse.ArgumentParser(description="합성 그림으로 채점 속도 측정")
+    parser.add_argument("--backends", nargs="+", default=["torch"], choices=BACKEND_NAMES)
+    parser.add_argument("--threads", nargs="+", type=int, default=None,
+                        help="스레드 수 (torch 또는 ONNX Runtime, 기본: 1, 코어 절반, 전체)")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=BATCH_SIZES)
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    parser.add_argument("--warmup", type=int, default=WARMUP_ROUNDS)
+    parser.add_argument("--preprocess", default="crop", choices=["crop", "processor"])
+    parser.add_argument("--words", nargs="+", default=None, help="일부 제시어만 사용 (기본: 전체)")
+    parser.add_argument("--no-handwriting", action="store_true", help="글씨 그림은 빼고 측정")
+    parser.add_argument("--no-guesses", action="store_true", help="전체 제시어 순위 계산을 빼고 측정 (SHOW_GUESSES = False)")
+    parser.add_argument("-o", "--output", default=None, help="결과 JSON 파일")
+    parser.add_argument("--compare", default=None, help="이전 결과 JSON과 비교")
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.words, handwriting=not args.no_handwriting)
+    print(f"AI 모델을 로딩 중입니다... (그림 {len(corpus)}장)")
+    model = CLIPModel.from_pretrained(MODEL_NAME)
+    processor = CLIPProcessor.from_pretrained(MODEL_NAME)
+
+    results = run_benchmark(model, processor, corpus, args.backends, args.threads, args.batch_sizes, args.rounds,
+                            args.warmup, args.preprocess, guesses=not args.no_guesses)
+    report = {"environment": environment_info(MODEL_NAME, corpus), "results": results}
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,172 @@
+import time
+STARTUP_T0 = time.perf_counter()  # 시작 시간 측정 기준 (import 시간도 재기 위해 가장 먼저)
+
 import tkinter as tk
-from tkinter import messagebox
-from PIL import Image, ImageDraw, ImageTk
-import pygame
+from tkinter import messagebox, ttk
+from PIL import Image, ImageTk
+import math
+import os
 import random
-import torch
-from transformers import CLIPProcessor, CLIPModel
+import threading
+from concurrent.futures import Future
+from asset_cache import AssetLoader
+from metrics import METRICS, StartupTimer, profile_round, serve_metrics
+from prompts import ALL_PROMPTS, KOREAN_NAMES, PROMPT_MAP
+from score_worker import ScoreWorker
+from session_log import BackgroundArchive, SessionArchive
+from strokes import StrokeStore
+# torch, transformers(ai_scorer)는 load_model 스레드에서, pygame은 첫 화면이 뜬 뒤에 불러옴
+IMPORTS_DONE = time.perf_counter()
 
 # ====== 기본 설정 ======
 CANVAS_WIDTH = 900
 CANVAS_HEIGHT = 600
 
-# ====== 전체 제시어 ======
-ALL_PROMPTS = [
-    "사과", "고양이", "사다리", "나무", "자동차", "부엉이", "의자", "전기톱", "폭탄", "딸기", "검", "황소", "도마뱀",
-    "물고기", "강아지", "꽃", "비행기", "컵", "칫솔", "바나나", "알약", "우주왕복선", "고기", "장갑", "화염방사기", "용",
-    "스마트폰", "텔레비전", "조개", "문어", "연필", "건전지", "쇠사슬", "빵", "교회", "거미", "무량공처", "벽돌", "탄산음료",
-    "전구", "독수리", "활", "헬리콥터", "배", "캥거루", "운동화", "책"
-]
-
-PROMPT_MAP = {
-    "사과": "apple", "바나나": "banana", "고양이": "cat", "딸기": "strawberry", "폭탄": "boom", "장갑": "glove",
-    "사다리": "ladder", "나무": "tree", "자동차": "car", "의자": "chair", "고기": "meat", "총": "gun", "검": "sword",
-    "부엉이": "owl", "전기톱": "chainsaw", "물고기": "fish", "강아지": "puppy", "꽃": "flower", "조개": "clam",
-    "비행기": "airplane", "컵": "cup", "칫솔": "toothbrush", "알약": "pill", "우주왕복선": "Space Shuttle", "황소": "bull",
-    "화염방사기": "flamethrower", "도마뱀": "lizard", "용(드래곤)": "dragon", "스마트폰": "smartphone", "텔레비전": "TV",
-    "문어": "octopus", "연필": "pencil", "건전지": "battery", "쇠사슬": "chain", "빵": "bread", "교회": "church",
-    "거미": "spider", "[무량공처]": "Satoru Gojo", "벽돌": "brick", "탄산음료": "soda", "전구": "light", "독수리": "eagle",
-    "활": "arrow", "헬리콥터": "helicopter", "배(선박)": "ship", "캥거루": "kangaroo", "운동화": "sneakers", "책": "book"
-}
+# ====== 선 그리기 설정 ======
+MIN_POINT_DISTANCE = 2  # 직전 점과 이 거리(px)보다 가까운 움직임은 건너뜀
+MOTION_THROTTLE_MS = 0  # 0보다 크면 이 간격보다 자주 오는 움직임 이벤트는 건너뜀 (느린 태블릿용)
+MAX_POINTS_PER_LINE = 256  # 캔버스 선 하나에 넣는 최대 점 개수 (넘으면 이어서 새 선을 만듦)
+
+# ====== 미리 채점 (그리는 도중 펜이 멈추면 백그라운드에서 채점해둠) ======
+SPECULATIVE_SCORING = True
+SPECULATIVE_DELAY_MS = 400
+
+# ====== 공용 채점 서버 (예: "127.0.0.1:50051", 없으면 이 창에서 직접 모델을 불러옴) ======
+SCORE_SERVER = os.environ.get("MANDI_SCORE_SERVER")
+
+# ====== 이미지 인코더 실행 방식 ("torch", "int8", "onnx") ======
+SCORER_BACKEND = os.environ.get("MANDI_BACKEND", "torch")
+
+# ====== 채점 전처리 ("crop": 그린 영역만 잘라 224x224로, "processor": 전체 캔버스를 CLIPProcessor로) ======
+PREPROCESS = os.environ.get("MANDI_PREPROCESS", "crop")
+
+# ====== 그림 프롬프트 템플릿 ("ensemble" 또는 JSON 파일 경로, 비우면 기존 "a sketch of a {}" 하나) ======
+TEMPLATES = os.environ.get("MANDI_TEMPLATES", "")
+
+# ====== 결과 팝업에 "만디가 생각한 것" 표시 (전체 제시어 중 상위 몇 개, 채점 서버 사용 시에는 표시 안 함) ======
+SHOW_GUESSES = True
+
+# 모델을 불러온 직후 채점 작업 스레드에서 가짜 그림으로 미리 채점 (첫 아이의 채점이 느리지 않게)
+WARMUP = os.environ.get("MANDI_WARMUP", "1") != "0"
+GUESS_TOP_K = 3
+
+# ====== 제출한 그림 기록 파일 (빈 값이면 기록하지 않음) ======
+ARCHIVE_PATH = os.environ.get("MANDI_ARCHIVE", os.path.join("archive", "drawings.jsonl"))
+
+# ====== 배경 이미지 (화면 크기로 줄인 것을 cache/assets에 저장해 두고 백그라운드에서 읽음) ======
+LOBBY_IMAGE = "mainlobby.jpg"
+GAME_IMAGE = "maingame.jpg"
+TUTORIAL_IMAGES = ["ttt1.jpg", "ttt2.jpg"]  # 도움말을 처음 열 때 읽음
+ASSET_POLL_MS = 30
+
+# ====== 시작 단계별 소요 시간 출력 (모델 로딩이 끝날 때 한 번) ======
+STARTUP_REPORT = os.environ.get("MANDI_STARTUP_REPORT", "1") != "0"
+
+# ====== 성능 기록 (구간별 시간 히스토그램, 누적 카운터) ======
+METRICS_PORT = int(os.environ.get("MANDI_METRICS_PORT", "0"))  # 0보다 크면 http://127.0.0.1:포트/metrics 로 제공
+METRICS_FILE = os.environ.get("MANDI_METRICS_FILE")  # 지정하면 라운드가 끝날 때마다 JSON으로 저장
+PROFILE_MODE = os.environ.get("MANDI_PROFILE", "")  # "cprofile" 또는 "torch"면 제출한 라운드마다 프로파일 저장
+PROFILE_DIR = os.environ.get("MANDI_PROFILE_DIR", "profiles")
+
+# ====== CPU 스레드 설정 (thread_tuning.py) ======
+# 이 PC에서 재둔 스레드 설정이 있으면 적용, 없으면 처음 실행할 때 모델을 게임에 넘기기 전에 재서 저장
+AUTO_TUNE_THREADS = os.environ.get("MANDI_AUTO_TUNE", "1") != "0"
+
+# ====== 함께 그리기 (화면을 나눠 여러 명이 같은 제시어를 그리고, 제출하면 모든 그림을 한 번에 채점) ======
+PLAYERS = max(2, int(os.environ.get("MANDI_PLAYERS", "2")))
+PLAYER_COLORS = ["#e74c3c", "#3498db", "#27ae60", "#f39c12", "#8e44ad", "#16a085"]
+
+
+class DrawingBoard:
+    # 캔버스 하나와 그 위에 그린 획 (마우스 입력 -> 캔버스 선 + StrokeStore 좌표)
+    # on_change: 점이 추가될 때마다 호출 (미리 채점 예약 등)
+    def __init__(self, parent, width, height, on_change=None, **canvas_options):
+        self.canvas = tk.Canvas(parent, width=width, height=height, bg="white", **canvas_options)
+        self.on_change = on_change
+
+        # 그린 선은 좌표만 기록하고, 채점할 때 한 번만 비트맵으로 그림
+        self.strokes = StrokeStore(width, height)
+
+        self.last_x, self.last_y = None, None  # 그리는 중인 획의 마지막 점 (None이면 그리는 중이 아님)
+        # 획 하나를 캔버스 선 하나로 이어 그림 (점이 추가될 때마다 canvas.coords로 늘림)
+        self.line_item = None
+        self.line_coords = []
+        self.last_motion_time = 0
+        self.pending_point = None  # 건너뛴 마지막 점 (손을 뗄 때 마저 그림)
+        self.locked = False  # 제출한 그림을 채점하는 동안은 더 그리지 못하게 함
+        self.canvas.bind("<ButtonPress-1>", self.start_draw)
+        self.canvas.bind("<B1-Motion>", self.draw_line)
+        self.canvas.bind("<ButtonRelease-1>", self.end_draw)
+
+    def start_draw(self, event):
+        if self.locked:
+            return
+        self.last_x, self.last_y = event.x, event.y
+        self.strokes.start_stroke(event.x, event.y, event.time)
+        self.line_item = None
+        self.line_coords = [event.x, event.y]
+        self.last_motion_time = event.time
+        self.pending_point = None
+
+    def draw_line(self, event):
+        # 획을 시작하지 않았으면 무시 (그리는 도중 결과 팝업이 캔버스를 지운 경우 등)
+        if self.last_x is None:
+            return
+        # 너무 가까운 점, 너무 잦은 이벤트는 건너뜀
+        dx, dy = event.x - self.last_x, event.y - self.last_y
+        too_close = dx * dx + dy * dy < MIN_POINT_DISTANCE * MIN_POINT_DISTANCE
+        too_soon = MOTION_THROTTLE_MS > 0 and event.time - self.last_motion_time < MOTION_THROTTLE_MS
+        if too_close or too_soon:
+            self.pending_point = (event.x, event.y, event.time)
+            return
+        self.last_motion_time = event.time
+        self.add_line_point(event.x, event.y, event.time)
+
+    def end_draw(self, event):
+        if self.last_x is None:
+            return
+        if self.pending_point is not None and self.pending_point[:2] != (self.last_x, self.last_y):
+            self.add_line_point(*self.pending_point)
+        self.end_stroke()
+
+    def end_stroke(self):
+        self.last_x, self.last_y = None, None
+        self.pending_point = None
+
+    def set_locked(self, locked):
+        # 잠그면 그리던 획도 거기서 끝냄 (제출한 뒤의 점은 채점에 들어가지 않으므로)
+        self.locked = locked
+        if locked:
+            self.end_stroke()
+        self.canvas.config(cursor="watch" if locked else "")
+
+    def add_line_point(self, x, y, t):
+        self.line_coords.extend((x, y))
+        if self.line_item is None:
+            self.line_item = self.canvas.create_line(*self.line_coords, fill="black", width=5, capstyle=tk.ROUND,
+                                                     joinstyle=tk.ROUND)
+        else:
+            self.canvas.coords(self.line_item, *self.line_coords)
+
+        # 선이 너무 길어지면 마지막 점에서 새 선으로 이어감 (coords 갱신 비용을 일정하게 유지)
+        if len(self.line_coords) >= MAX_POINTS_PER_LINE * 2:
+            self.line_item = None
+            self.line_coords = [x, y]
+
+        self.strokes.add_point(x, y, t)
+        self.pending_point = None
+        self.last_x, self.last_y = x, y
+        if self.on_change is not None:
+            self.on_change()
+
+    def clear(self, background=None):
+        self.canvas.delete("all")
+        if background:
+            self.canvas.create_image(0, 0, image=background, anchor="nw", tags="background")
+        self.strokes.clear()
+        self.line_item = None
+        self.line_coords = []
+        self.end_stroke()
 
 
 class PaintGame:
@@ -35,32 +174,56 @@ class PaintGame:
         self.root = root
         self.root.title("AI 드로잉 교육 게임")
         self.root.resizable(False, False)
+        self.startup = StartupTimer(STARTUP_T0)
+        self.startup.record("imports", STARTUP_T0, IMPORTS_DONE - STARTUP_T0)
 
         # 게임 상태 변수
         self.success_count = 0  # 성공 갯수 카운트
 
         # ============================================
-        # AI 모델 로딩
+        # AI 모델 로딩 (백그라운드 스레드, 로비는 바로 표시)
         # ============================================
-        print("AI 모델을 로딩 중입니다... 잠시만 기다려주세요.")
-        try:
-            self.model_name = "openai/clip-vit-base-patch32"
-            self.model = CLIPModel.from_pretrained(self.model_name)
-            self.processor = CLIPProcessor.from_pretrained(self.model_name)
-            print("AI 모델 로딩 완료!")
-        except Exception as e:
-            print(f"AI 모델 로딩 실패: {e}")
-            self.model = None
+        self.model_name = None  # 작업 스레드에서 정함 (load_model)
+        self.thread_profile = None  # 이 PC에 저장된 스레드 설정 (모델을 직접 불러올 때 적용)
+        self.loading_text = None  # 작업 스레드가 정하면 poll_model이 로딩 문구에 반영
+        self.model = None
+        self.scorer = None
+        self.model_ready = False
+        self.model_future = Future()
+        threading.Thread(target=self.load_model, daemon=True).start()
+
+        # 채점은 작업 스레드에서 처리 (화면이 멈추지 않도록)
+        self.score_worker = ScoreWorker()
+        self.score_job = None
+        self.polling_score = False
+
+        # 제출한 그림 기록
+        self.archive = None
+        if ARCHIVE_PATH:
+            try:
+                self.archive = BackgroundArchive(SessionArchive(ARCHIVE_PATH))
+            except OSError as e:
+                print(f"그림 기록 파일을 열 수 없습니다: {e}")
+        self.submitted_strokes = None
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+        # 성능 기록 보기 (브라우저나 curl로 http://127.0.0.1:포트/metrics)
+        self.check_started = None
+        if METRICS_PORT > 0:
+            try:
+                serve_metrics(METRICS_PORT)
+                print(f"성능 기록: http://127.0.0.1:{METRICS_PORT}/metrics")
+            except OSError as e:
+                print(f"성능 기록 서버를 열 수 없습니다: {e}")
 
-        # ============================================
-        # 음악 재생
-        # ============================================
-        pygame.mixer.init()
-        try:
-            pygame.mixer.music.load("animalforest.mp3")
-            pygame.mixer.music.play(-1)
-        except:
-            pass
+        # 미리 채점 상태: 그림이 바뀔 때마다 canvas_version 증가
+        self.canvas_version = 0
+        self.spec_after_id = None
+        self.spec_job = None
+        self.spec_job_key = None
+        self.spec_result = None
+
+        # 음악은 첫 화면이 그려진 뒤에 재생 (on_first_frame)
 
         # ============================================
         # 1. 표지 화면 (Lobby)
@@ -69,24 +232,34 @@ class PaintGame:
         self.cover_frame.pack()
         self.cover_frame.pack_propagate(False)
 
-        try:
-            cover_img = Image.open("mainlobby.jpg")
-            cover_img = cover_img.resize((CANVAS_WIDTH, CANVAS_HEIGHT))
-            self.cover_photo = ImageTk.PhotoImage(cover_img)
-        except:
-            self.cover_photo = None
-
-        if self.cover_photo:
-            self.cover_label = tk.Label(self.cover_frame, image=self.cover_photo)
-        else:
-            self.cover_label = tk.Label(self.cover_frame, text="AI 드로잉 게임", bg="lightblue", font=("Arial", 30))
+        # 로비, 게임 배경은 바로 읽기 시작하고, 다 읽히면 화면에 붙임 (그 전까지는 단색 바탕)
+        self.assets = AssetLoader((CANVAS_WIDTH, CANVAS_HEIGHT))
+        self.cover_photo = None
+        self.cover_label = tk.Label(self.cover_frame, bg="lightblue", font=("Arial", 30))
         self.cover_label.pack(fill="both", expand=True)
+        self.when_assets_loaded([LOBBY_IMAGE], self.show_cover_image)
+
+        # [모델 로딩 표시]
+        self.loading_label = tk.Label(self.cover_frame, text="만디가 준비하고 있다요...", font=("Arial", 12),
+                                      bg="white")
+        self.loading_label.place(relx=0.5, rely=0.6, anchor="center")
+        self.loading_bar = ttk.Progressbar(self.cover_frame, mode="indeterminate", length=200)
+        self.loading_bar.place(relx=0.5, rely=0.65, anchor="center")
+        self.loading_bar.start(15)
+        self.root.after(100, self.poll_model)
+        # after_idle은 창이 화면에 나타나기 전에 실행될 수 있으므로, 로비가 실제로 화면에 붙은(<Map>) 뒤에 기록
+        self.first_map_binding = self.cover_frame.bind("<Map>", self.on_cover_mapped)
 
         # [시작 버튼]
         self.cover_button = tk.Button(self.cover_frame, text="게임 시작", font=("Arial", 18, "bold"),
                                       bg="white", fg="black", command=self.start_game)
         self.cover_button.place(relx=0.5, rely=0.75, anchor="center")
 
+        # [함께 그리기 버튼]
+        self.split_button = tk.Button(self.cover_frame, text=f"함께 그리기 ({PLAYERS}명)", font=("Arial", 12),
+                                      command=lambda: self.start_game(PLAYERS))
+        self.split_button.place(relx=0.5, rely=0.815, anchor="center")
+
         # [튜토리얼 버튼]
         self.tutorial_btn = tk.Button(self.cover_frame, text="도움말", font=("Arial", 12),
                                       command=self.show_tutorial)
@@ -97,25 +270,13 @@ class PaintGame:
         # ============================================
         self.tutorial_frame = tk.Frame(self.cover_frame, width=CANVAS_WIDTH, height=CANVAS_HEIGHT, bg="black")
 
-        # 튜토리얼 이미지 2장 로드
+        # 튜토리얼 이미지는 도움말을 처음 열 때 읽음 (show_tutorial)
         self.tutorial_images = []
-        image_files = ["ttt1.jpg", "ttt2.jpg"]
-
-        for f in image_files:
-            try:
-                img = Image.open(f).resize((CANVAS_WIDTH, CANVAS_HEIGHT))
-                self.tutorial_images.append(ImageTk.PhotoImage(img))
-            except:
-                print(f"{f}를 찾을 수 없습니다.")
-
-        if not self.tutorial_images:
-            temp_img = Image.new("RGB", (CANVAS_WIDTH, CANVAS_HEIGHT), "gray")
-            self.tutorial_images.append(ImageTk.PhotoImage(temp_img))
-
+        self.tutorial_requested = False
         self.current_tut_page = 0
 
         # 이미지를 보여줄 라벨
-        self.tut_label = tk.Label(self.tutorial_frame, image=self.tutorial_images[0], bg="black")
+        self.tut_label = tk.Label(self.tutorial_frame, bg="black", fg="white", font=("Arial", 15))
         self.tut_label.pack(fill="both", expand=True)
 
         # [X 닫기 버튼]
@@ -144,29 +305,208 @@ class PaintGame:
 
         self.prompt_label = tk.Label(self.game_frame, font=("Arial", 18))
 
+        # 혼자 할 때 쓰는 캔버스 (self.canvas, self.strokes는 이 캔버스의 것)
+        self.bg_photo = None
+        self.board = DrawingBoard(self.game_frame, CANVAS_WIDTH, CANVAS_HEIGHT, self.mark_canvas_dirty)
+        self.canvas = self.board.canvas
+        self.strokes = self.board.strokes
+        self.when_assets_loaded([GAME_IMAGE], self.show_game_background)
+
+        # 함께 그리기 캔버스들 (start_game에서 인원수에 맞춰 만듦)
+        self.split_frame = tk.Frame(self.game_frame)
+        self.players = 1
+        self.boards = [self.board]
+        self.player_wins = [0]
+
+        self.check_button = tk.Button(self.game_frame, text="만디에게 보여주기", font=("Arial", 14),
+                                      command=self.check_answer)
+
+    # ====== AI 모델 로딩 함수 ======
+    def load_model(self):
+        # 작업 스레드에서 실행: Tk 위젯은 건드리지 않고 결과만 model_future에 넘김
+        # 채점 서버에 연결되면 torch는 아예 불러오지 않음 (모델 이름은 torch 없는 scoring에서)
+        # 어떤 오류가 나도 model_future는 꼭 채움 (안 그러면 로딩 표시가 계속 돌고 check_answer가 계속 기다림)
         try:
-            bg_img = Image.open("maingame.jpg")
-            bg_img = bg_img.resize((CANVAS_WIDTH, CANVAS_HEIGHT))
-            self.bg_photo = ImageTk.PhotoImage(bg_img)
-        except:
-            self.bg_photo = None
+            from scoring import MODEL_NAME
 
-        self.canvas = tk.Canvas(self.game_frame, width=CANVAS_WIDTH, height=CANVAS_HEIGHT, bg="white")
-        if self.bg_photo:
-            self.canvas.create_image(0, 0, image=self.bg_photo, anchor="nw")
+            self.model_name = MODEL_NAME
+            with self.startup.phase("model"):
+                loaded = self.connect_or_load()
+        except Exception as e:
+            print(f"AI 모델 로딩 실패: {e}")
+            loaded = None
+        self.model_future.set_result(loaded)
 
-        self.image = Image.new("RGB", (CANVAS_WIDTH, CANVAS_HEIGHT), "white")
-        self.draw = ImageDraw.Draw(self.image)
+    def calibrate_threads(self):
+        # 이 PC에서 처음 실행이면 모델을 불러오기 전에 하위 프로세스에서 측정
+        # (게임, 워밍업, 미리 채점은 아직 시작 전이라 CPU를 나눠 쓰지 않음, 그동안 로비는 로딩 중으로 보임)
+        from thread_tuning import tune_in_subprocess
 
-        self.last_x, self.last_y = None, None
-        self.canvas.bind("<ButtonPress-1>", self.start_draw)
-        self.canvas.bind("<B1-Motion>", self.draw_line)
+        print("이 PC에 맞는 스레드 수를 재는 중입니다... (처음 한 번만)")
+        self.loading_text = "만디가 이 컴퓨터에 맞춰 준비하고 있다요... (처음 한 번만)"
+        with self.startup.phase("thread tuning"):
+            profile = tune_in_subprocess(SCORER_BACKEND, PREPROCESS, self.model_name)
+        if profile is not None:
+            print(f"스레드 설정 저장: {profile['threads']}개, inter-op {profile['interop']}개")
+        return profile
 
-        self.check_button = tk.Button(self.game_frame, text="만디에게 보여주기", font=("Arial", 14),
-                                      command=self.check_answer)
+    def apply_worker_threads(self):
+        # torch intra-op 스레드 수는 호출한 스레드에만 적용되므로 채점 작업 스레드에서 실행
+        from thread_tuning import apply_threads
+
+        apply_threads(self.thread_profile)
+
+    def connect_or_load(self):
+        if SCORE_SERVER:
+            from score_server import RemoteScorer
+
+            try:
+                remote = RemoteScorer(SCORE_SERVER, preprocess=PREPROCESS)
+            except ValueError as e:
+                print(f"{e} -> 모델을 직접 불러옵니다.")
+            else:
+                if remote.ping():
+                    print(f"채점 서버에 연결했습니다: {SCORE_SERVER}")
+                    return None, None, remote
+                print("채점 서버에 연결할 수 없어 모델을 직접 불러옵니다.")
+        return self.load_local_model()
+
+    def load_local_model(self):
+        print("AI 모델을 로딩 중입니다... 잠시만 기다려주세요.")
+        try:
+            # torch를 불러오는 데만 몇 초 걸리므로 로비를 띄운 뒤 여기서 import
+            with self.startup.phase("imports (ML)"):
+                from transformers import CLIPProcessor, CLIPModel
+                from ai_scorer import ClipScorer, load_templates
+                from thread_tuning import apply_interop, load_profile, onnx_threads
+
+            # 게임 도중 채점 서버 오류로 여기 온 경우(model_ready)에는 재지 않음 (아이가 채점을 기다리는 중)
+            self.thread_profile = load_profile(SCORER_BACKEND, PREPROCESS)
+            if self.thread_profile is None and AUTO_TUNE_THREADS and not self.model_ready:
+                self.thread_profile = self.calibrate_threads()
+            # torch를 불러온 직후, 모델 로딩과 첫 채점 전에 적용해야 inter-op 스레드 수까지 바뀜
+            # (intra-op은 채점 작업 스레드에서 apply_worker_threads로, onnx는 세션을 만들 때 적용)
+            if self.thread_profile is not None:
+                apply_interop(self.thread_profile)
+                print(f"스레드 설정: {self.thread_profile['threads']}개, inter-op {self.thread_profile['interop']}개")
+            threads, interop = onnx_threads(self.thread_profile)
+
+            model = CLIPModel.from_pretrained(self.model_name)
+            processor = CLIPProcessor.from_pretrained(self.model_name)
+            # 제시어 전체의 텍스트 임베딩을 미리 계산 (채점 때는 이미지만 인코딩)
+            scorer = ClipScorer(model, processor, PROMPT_MAP.values(), self.model_name, SCORER_BACKEND,
+                                preprocess=PREPROCESS, templates=load_templates(TEMPLATES), threads=threads,
+                                interop=interop)
+            print("AI 모델 로딩 완료!")
+            return model, processor, scorer
+        except Exception as e:
+            print(f"AI 모델 로딩 실패: {e}")
+            return None
+
+    def poll_model(self):
+        if not self.model_future.done():
+            if self.loading_text is not None:
+                self.loading_label.config(text=self.loading_text)
+                self.loading_text = None
+            self.root.after(100, self.poll_model)
+            return
+
+        loaded = self.model_future.result()
+        if loaded:
+            self.model, self.processor, self.scorer = loaded
+            # 채점 작업 스레드에 먼저 넣어서, 실제 채점과 동시에 돌지 않고 그보다 먼저 끝나게 함
+            if self.model is not None and self.thread_profile is not None:
+                self.score_worker.submit(self.apply_worker_threads)
+            if WARMUP and hasattr(self.scorer, "warm_up"):
+                self.score_worker.submit(self.warm_up_scorer)
+        self.model_ready = True
+        self.loading_bar.stop()
+        self.loading_bar.place_forget()
+        self.loading_label.place_forget()
+
+        self.startup.mark("interactive")
+        if STARTUP_REPORT:
+            print(self.startup.report())
+
+    def warm_up_scorer(self):
+        # 첫 제시어로 워밍업 (채점 서버를 쓰면 서버가 알아서 워밍업하므로 여기서는 안 함)
+        word_en = PROMPT_MAP.get(self.prompts[self.current_prompt_index], "object")
+        times = self.scorer.warm_up([word_en])
+        print("워밍업 완료: " + " -> ".join(f"{ms:.0f} ms" for ms in times))
+
+    # ====== 첫 화면이 그려진 뒤에 할 일 ======
+    def on_cover_mapped(self, event):
+        # 처음 한 번만 (다시 시작해서 로비가 다시 붙을 때는 무시)
+        self.cover_frame.unbind("<Map>", self.first_map_binding)
+        self.root.update_idletasks()  # 밀려 있는 그리기를 끝낸 다음에 첫 화면으로 기록
+        self.root.after(0, self.on_first_frame)
+
+    def on_first_frame(self):
+        self.startup.mark("first frame")
+        threading.Thread(target=self.start_music, daemon=True).start()
+
+    def start_music(self):
+        # pygame import와 오디오 장치 초기화는 느릴 수 있어 첫 화면 뒤, 별도 스레드에서
+        with self.startup.phase("audio"):
+            try:
+                import pygame
+                pygame.mixer.init()
+                pygame.mixer.music.load("animalforest.mp3")
+                pygame.mixer.music.play(-1)
+            except Exception as e:
+                print(f"음악을 재생할 수 없습니다: {e}")
+
+    def close(self):
+        # 기록 파일을 마저 디스크에 쓰고 종료
+        if self.archive is not None:
+            self.archive.close()
+        self.assets.shutdown()
+        self.root.destroy()
+
+    # ====== 배경 이미지 (백그라운드에서 읽은 뒤 UI 스레드에서 PhotoImage로 만듦) ======
+    def when_assets_loaded(self, paths, callback):
+        # paths 이미지가 모두 읽히면 callback(이미지 목록) 호출 (읽지 못한 이미지는 None)
+        futures = [self.assets.request(path) for path in paths]
+        self.poll_assets(futures, callback)
+
+    def poll_assets(self, futures, callback):
+        if not all(future.done() for future in futures):
+            self.root.after(ASSET_POLL_MS, self.poll_assets, futures, callback)
+            return
+        callback([future.result() if future.exception() is None else None for future in futures])
+
+    def show_cover_image(self, images):
+        self.startup.mark("lobby image")
+        if images[0] is None:
+            self.cover_label.config(text="AI 드로잉 게임")
+            return
+        self.cover_photo = ImageTk.PhotoImage(images[0])
+        self.cover_label.config(image=self.cover_photo)
+
+    def show_game_background(self, images):
+        if images[0] is None:
+            return
+        self.bg_photo = ImageTk.PhotoImage(images[0])
+        self.canvas.create_image(0, 0, image=self.bg_photo, anchor="nw", tags="background")
+        self.canvas.tag_lower("background")  # 이미 그린 선보다 아래에 놓음
+
+    def show_tutorial_images(self, images):
+        for f, img in zip(TUTORIAL_IMAGES, images):
+            if img is None:
+                print(f"{f}를 찾을 수 없습니다.")
+            else:
+                self.tutorial_images.append(ImageTk.PhotoImage(img))
+
+        if not self.tutorial_images:
+            temp_img = Image.new("RGB", (CANVAS_WIDTH, CANVAS_HEIGHT), "gray")
+            self.tutorial_images.append(ImageTk.PhotoImage(temp_img))
+        self.update_tutorial_ui()
 
     # ====== 튜토리얼 관련 함수 ======
     def show_tutorial(self):
+        if not self.tutorial_requested:
+            self.tutorial_requested = True
+            self.when_assets_loaded(TUTORIAL_IMAGES, self.show_tutorial_images)
         self.current_tut_page = 0
         self.update_tutorial_ui()
         self.tutorial_frame.place(x=0, y=0)
@@ -185,6 +525,12 @@ class PaintGame:
             self.update_tutorial_ui()
 
     def update_tutorial_ui(self):
+        if not self.tutorial_images:
+            # 아직 이미지를 읽는 중
+            self.tut_label.config(text="불러오는 중...")
+            self.prev_btn.place_forget()
+            self.next_btn.place_forget()
+            return
         self.tut_label.config(image=self.tutorial_images[self.current_tut_page])
 
         if self.current_tut_page == 0:
@@ -197,8 +543,21 @@ class PaintGame:
         else:
             self.next_btn.place(relx=0.9, rely=0.9, anchor="center")
 
+    def guess_message(self, answer_kr, guesses):
+        # 전체 제시어 중 만디가 가장 비슷하다고 본 것들
+        names = [f"{KOREAN_NAMES.get(word, word)} {prob * 100:.0f}%" for word, prob in guesses["top"]]
+        if guesses["rank"] == 1:
+            head = f"만디도 {answer_kr}(이)라고 생각했다요!"
+        else:
+            best = KOREAN_NAMES.get(guesses["top"][0][0], guesses["top"][0][0])
+            head = f"만디는 {best}인 줄 알았다요..."
+            if guesses["rank"] is not None:
+                head += f" ({answer_kr}는 {guesses['total']}개 중 {guesses['rank']}번째)"
+        return head + "\n만디의 생각: " + ", ".join(names)
+
     # ====== 게임 재시작 함수 ======
     def restart_game(self):
+        self.cancel_scoring()
         self.game_frame.pack_forget()
         self.cover_frame.pack()
 
@@ -209,86 +568,279 @@ class PaintGame:
         self.reset_canvas()
 
     # ====== 게임 진행 함수 ======
-    def start_game(self):
+    def start_game(self, players=1):
         self.cover_frame.pack_forget()
         self.success_count = 0
+        self.set_players(players)
 
         self.prompt_label.config(text=f"필요한 준비물: {self.prompts[self.current_prompt_index]}")
         self.prompt_label.pack(pady=10)
-        self.canvas.pack(pady=5)
+        # 이전 판과 인원수가 다를 수 있으므로 캔버스 영역과 버튼을 다시 순서대로 배치
+        self.canvas.pack_forget()
+        self.split_frame.pack_forget()
+        self.check_button.pack_forget()
+        (self.canvas if players == 1 else self.split_frame).pack(pady=5)
         self.check_button.pack(pady=10)
         self.game_frame.pack()
 
-    def start_draw(self, event):
-        self.last_x, self.last_y = event.x, event.y
+    def set_players(self, players):
+        # 1명이면 기본 캔버스, 여러 명이면 화면을 나눈 캔버스를 인원수만큼 새로 만듦
+        self.players = players
+        self.player_wins = [0] * players
+        for child in self.split_frame.winfo_children():
+            child.destroy()
+        if players == 1:
+            self.boards = [self.board]
+            return
 
-    def draw_line(self, event):
-        self.canvas.create_line(self.last_x, self.last_y, event.x, event.y, fill="black", width=5, capstyle=tk.ROUND,
-                                smooth=True)
-        self.draw.line((self.last_x, self.last_y, event.x, event.y), fill="black", width=5)
-        self.last_x, self.last_y = event.x, event.y
+        cols = math.ceil(math.sqrt(players))
+        rows = math.ceil(players / cols)
+        width = CANVAS_WIDTH // cols - 10
+        height = CANVAS_HEIGHT // rows - 40
+        self.boards = []
+        for i in range(players):
+            color = PLAYER_COLORS[i % len(PLAYER_COLORS)]
+            cell = tk.Frame(self.split_frame)
+            cell.grid(row=i // cols, column=i % cols, padx=5, pady=2)
+            tk.Label(cell, text=f"{i + 1}번 친구", font=("Arial", 12, "bold"), fg=color).pack()
+            board = DrawingBoard(cell, width, height, self.mark_canvas_dirty, highlightthickness=3,
+                                 highlightbackground=color)
+            board.canvas.pack()
+            self.boards.append(board)
+
+    # ====== 미리 채점 함수 ======
+    def mark_canvas_dirty(self):
+        self.canvas_version += 1
+        # 프로파일 모드에서는 미리 채점하지 않음 (모든 라운드를 제출할 때 채점해야 그 라운드를 프로파일링할 수 있음)
+        if not SPECULATIVE_SCORING or self.players > 1 or PROFILE_MODE:
+            return
+        # 펜이 SPECULATIVE_DELAY_MS 동안 멈춰 있을 때만 채점 (디바운스)
+        if self.spec_after_id is not None:
+            self.root.after_cancel(self.spec_after_id)
+        self.spec_after_id = self.root.after(SPECULATIVE_DELAY_MS, self.speculate)
+
+    def speculate(self):
+        self.spec_after_id = None
+        if not self.model_ready or self.score_job is not None:
+            return
+
+        key = (self.canvas_version, self.prompts[self.current_prompt_index])
+        if key == self.spec_job_key or (self.spec_result and self.spec_result[0] == key):
+            return
+
+        # 이전 그림에 대한 미리 채점은 더 이상 필요 없음
+        if self.spec_job is not None:
+            self.spec_job.cancel()
+        self.spec_job = self.score_worker.submit(self.calculate_ai_score, key[1], self.strokes.copy(), True)
+        self.spec_job_key = key
+        self.start_polling_score()
+
+    def cancel_speculation(self):
+        if self.spec_after_id is not None:
+            self.root.after_cancel(self.spec_after_id)
+            self.spec_after_id = None
+        if self.spec_job is not None:
+            self.spec_job.cancel()
+        self.spec_job = None
+        self.spec_job_key = None
+        self.spec_result = None
+
+    def lock_boards(self, locked):
+        # 제출부터 결과 팝업이 닫힐 때까지 잠가서, 그 사이에 그린 획이 다음 라운드에서 말없이 사라지지 않게 함
+        for board in self.boards:
+            board.set_locked(locked)
 
     def reset_canvas(self):
-        self.canvas.delete("all")
-        if self.bg_photo:
-            self.canvas.create_image(0, 0, image=self.bg_photo, anchor="nw")
-        self.image = Image.new("RGB", (CANVAS_WIDTH, CANVAS_HEIGHT), "white")
-        self.draw = ImageDraw.Draw(self.image)
+        self.board.clear(self.bg_photo)
+        for board in self.boards:
+            if board is not self.board:
+                board.clear()
+        self.canvas_version += 1
+        self.cancel_speculation()
 
     # ====== AI 점수 계산 (글씨 감지 강화) ======
-    def calculate_ai_score(self, target_word_kr):
-        if self.model is None:
-            return random.randint(30, 70)
+    def calculate_ai_score(self, target_word_kr, strokes=None, speculative=False):
+        # 작업 스레드에서 호출될 때는 제출 시점의 획 스냅샷을 받음
+        if strokes is None:
+            strokes = self.strokes
+        return self.calculate_ai_scores(target_word_kr, [strokes], speculative)[0]
+
+    def calculate_ai_scores(self, target_word_kr, strokes_list, speculative=False):
+        # 같은 제시어로 그린 여러 그림을 한 번에 채점 (함께 그리기) -> 그림마다 (점수, 글씨 확률, 만디의 생각)
+        # speculative: 미리 채점 (프로파일링하지 않고, 카운터는 speculative_ 이름으로 따로 셈)
+        with METRICS.counter_prefix("speculative_" if speculative else ""):
+            return self.score_drawings(target_word_kr, strokes_list, speculative)
+
+    def score_drawings(self, target_word_kr, strokes_list, speculative):
+        # 채점 순서(빈 그림 판별 -> 래스터화 -> 이미지 인코딩 -> 점수)는 벤치마크와 같은 scoring.score_strokes
+        from scoring import MIN_SCORE, score_strokes
+
+        if self.scorer is None:
+            return [(MIN_SCORE, 0.0, None) if strokes.trivial_reason() is not None else
+                    (random.randint(30, 70), 0.0, None) for strokes in strokes_list]
 
         target_word_en = PROMPT_MAP.get(target_word_kr, "object")
+        words_en = [target_word_en] * len(strokes_list)
 
-        # [0] 그림, [1] 정답 단어 글씨(함정), [2-3] 일반 글씨, [4-5] 무의미
-        text_prompts = [
-            f"a sketch of a {target_word_en}",
-            f"the written word '{target_word_en}'",
-            "written text",
-            "handwriting and letters",
-            "messy scribbles",
-            "blank white paper"
-        ]
-
-        inputs = self.processor(text=text_prompts, images=self.image, return_tensors="pt", padding=True)
-        with torch.no_grad():
-            outputs = self.model(**inputs)
+        def score():
+            # [0] 그림, [1] 정답 단어 글씨(함정), [2-3] 일반 글씨, [4-5] 무의미
+            # 텍스트 임베딩은 미리 계산된 값을 쓰고 이미지만 모델에 통과시킴 (여러 장이면 한 번의 forward)
+            return score_strokes(self.scorer, strokes_list, words_en, PREPROCESS, SHOW_GUESSES, GUESS_TOP_K)
 
-        probs = outputs.logits_per_image.softmax(dim=1)[0]
+        # PROFILE_MODE가 켜져 있으면 제출한 라운드의 채점 한 번을 프로파일링해서 PROFILE_DIR에 저장
+        with profile_round("" if speculative else PROFILE_MODE, PROFILE_DIR, target_word_en):
+            try:
+                results = score()
+            except (OSError, RuntimeError) as e:
+                # 채점 서버 오류(연결 끊김, 시간 초과, 서버 쪽 채점 실패)만 처리, 직접 불러온 모델의 오류는 그대로 올림
+                if self.model is not None:
+                    raise
+                results = self.retry_after_server_error(e, score)
+                if results is None:
+                    return self.score_drawings(target_word_kr, strokes_list, speculative)
+
+        for i, result in enumerate(results):
+            name = f"[{target_word_kr}]" if len(strokes_list) == 1 else f"[{target_word_kr}] {i + 1}번 친구"
+            if result["trivial"] is not None:
+                print(f"{name} 채점 생략 ({result['trivial']})")
+                METRICS.increment("trivial_skips")
+                continue
+
+            print(name)
+            print("글씨:", result["text_prob"])
+            print("그림:", result["probs"][0])
+            if result["penalized"]:
+                print(">> 글씨 감지됨! 점수 대폭 삭감")
+            guesses = result["guesses"]
+            if guesses is not None:
+                print(f"만디의 생각: {guesses['top']} (정답 순위 {guesses['rank']}/{guesses['total']})")
+
+        cache = getattr(self.scorer, "cache", None)
+        if cache is not None:
+            stats = cache.stats()
+            print(f"채점 캐시: 적중 {stats['hits']} / 미스 {stats['misses']}")
+
+        return [(result["score"], result["text_prob"], result["guesses"]) for result in results]
+
+    def retry_after_server_error(self, error, score):
+        # 잠깐 느렸거나 끊긴 경우를 위해 한 번은 다시 연결해서 재시도 (오류가 나면 RemoteScorer가 연결을 닫아 둠)
+        # 그래도 안 되면 이 창에서 직접 모델을 불러와 계속 진행 (모델도 못 불러오면 None)
+        print(f"채점 서버 오류: {error}")
+        try:
+            return score()
+        except (OSError, RuntimeError) as e:
+            print(f"채점 서버 재시도 실패: {e}")
+
+        loaded = self.load_local_model()
+        if not loaded:
+            self.scorer = None
+            return None
+        self.model, self.processor, self.scorer = loaded
+        if self.thread_profile is not None:
+            self.apply_worker_threads()  # 여기가 채점 작업 스레드
+        return score()
 
-        prob_drawing = probs[0].item()
-        prob_word_text = probs[1].item()
-        prob_general_text = probs[2].item() + probs[3].item()
+    # ====== 정답 확인 및 결과 처리 (카운트 기능 추가) ======
+    def check_answer(self):
+        # 모델이 아직 로딩 중이면 준비될 때까지 기다렸다가 다시 채점
+        if not self.model_ready:
+            self.check_button.config(text="만디가 준비 중...", state="disabled")
+            self.root.after(100, self.check_answer)
+            return
 
-        total_text_prob = prob_word_text + prob_general_text
+        # 이미 채점 중이면 연타 무시
+        if self.score_job is not None:
+            return
 
-        print(f"[{target_word_kr}] ")
-        print("글씨:", total_text_prob)
-        print("그림:", prob_drawing)
+        self.check_button.config(text="채점 중...", state="disabled")
+        self.lock_boards(True)
+        self.check_started = time.perf_counter()
+        METRICS.increment("rounds")
 
-        final_score = int(prob_drawing * 100)
+        answer_kr = self.prompts[self.current_prompt_index]
+        self.score_answer = answer_kr
 
-        # 글씨 감지 시 페널티 적용
-        if total_text_prob > prob_drawing or total_text_prob > 0.25:
-            print(">> 글씨 감지됨! 점수 대폭 삭감")
-            final_score = min(20, int(final_score * 0.2))
+        # 함께 그리기: 모든 친구의 그림을 한 작업으로 묶어 한 번에 채점 (미리 채점은 하지 않음)
+        if self.players > 1:
+            self.submitted_strokes = [board.strokes.copy() for board in self.boards]
+            self.score_job = self.score_worker.submit(self.calculate_ai_scores, answer_kr, self.submitted_strokes)
+            self.start_polling_score()
+            return
 
-        if final_score < 10: final_score = 10
-        if final_score > 98: final_score = 100
+        self.submitted_strokes = self.strokes.copy()
+        key = (self.canvas_version, answer_kr)
 
-        return final_score, total_text_prob
+        # 그린 뒤로 바뀐 게 없으면 미리 채점해둔 결과를 바로 사용
+        if self.spec_result and self.spec_result[0] == key:
+            METRICS.increment("speculative_hits")
+            self.show_result(answer_kr, *self.spec_result[1])
+            return
 
-    # ====== 정답 확인 및 결과 처리 (카운트 기능 추가) ======
-    def check_answer(self):
-        self.check_button.config(text="채점 중...", state="disabled")
-        self.root.update()
+        # 같은 그림을 미리 채점하는 중이면 그 작업을 그대로 이어받음
+        if self.spec_job is not None and self.spec_job_key == key:
+            self.score_job = self.spec_job
+        else:
+            if self.spec_job is not None:
+                self.spec_job.cancel()
+            self.score_job = self.score_worker.submit(self.calculate_ai_score, answer_kr, self.submitted_strokes)
+        self.spec_job = None
+        self.spec_job_key = None
+        self.start_polling_score()
+
+    def start_polling_score(self):
+        # poll_score 루프는 항상 하나만 돌게 함
+        if not self.polling_score:
+            self.polling_score = True
+            self.root.after(30, self.poll_score)
+
+    def poll_score(self):
+        for job in self.score_worker.poll():
+            if job is self.spec_job:
+                self.spec_job = None
+                if job.error is None:
+                    self.spec_result = (self.spec_job_key, job.result)
+                self.spec_job_key = None
+            elif job is self.score_job:
+                self.score_job = None
+                if job.error is not None:
+                    print(f"채점 실패: {job.error}")
+                    self.check_button.config(text="만디에게 보여주기", state="normal")
+                    self.lock_boards(False)
+                elif self.players > 1:
+                    self.show_results(self.score_answer, job.result)
+                else:
+                    self.show_result(self.score_answer, *job.result)
+
+        if self.score_job is not None or self.spec_job is not None:
+            self.root.after(30, self.poll_score)
+        else:
+            self.polling_score = False
+
+    def cancel_scoring(self):
+        # 라운드가 넘어가면 진행 중인 채점 결과는 버림
+        if self.score_job is not None:
+            self.score_job.cancel()
+            self.score_job = None
+        self.cancel_speculation()
+        self.check_button.config(text="만디에게 보여주기", state="normal")
+        self.lock_boards(False)
+
+    def record_round_metrics(self):
+        # 버튼을 누른 때부터 결과 팝업을 띄우기 직전까지 (채점 대기 + 폴링 지연 포함)
+        if self.check_started is not None:
+            METRICS.observe("ui_round_trip", (time.perf_counter() - self.check_started) * 1000)
+            self.check_started = None
+        if METRICS_FILE:
+            try:
+                METRICS.write_json(METRICS_FILE)
+            except OSError as e:
+                print(f"성능 기록 저장 실패: {e}")
 
-        answer_kr = self.prompts[self.current_prompt_index]
-        score, text = self.calculate_ai_score(answer_kr)
+    def show_result(self, answer_kr, score, text, guesses=None):
+        self.record_round_metrics()
 
-        self.check_button.config(text="만디에게 보여주기", state="normal")
+        if self.archive is not None:
+            self.archive.append(answer_kr, score, text, self.submitted_strokes, self.current_prompt_index)
 
         # 50점 넘으면 성공 카운트 증가
         if score > 50:
@@ -305,37 +857,87 @@ class PaintGame:
         if text > 0.25:
             msg += "? \n 우씨, 만디는 글씨를 못읽는 거다요!"
 
+        if guesses is not None and guesses["top"]:
+            msg += "\n\n" + self.guess_message(answer_kr, guesses)
+
         messagebox.showinfo("만디의 생각", f"필요한 준비물: {answer_kr}\n{msg}")
+        # 팝업이 닫힌 뒤에 버튼을 다시 살려서, 팝업 중 누른 클릭이 다음 채점으로 이어지지 않게 함
+        self.check_button.config(text="만디에게 보여주기", state="normal")
+        self.lock_boards(False)
+        self.next_round()
+
+    def show_results(self, answer_kr, results):
+        # 함께 그리기: 친구마다 점수를 보여주고, 가장 잘 그린 친구(50점 초과)가 이번 라운드를 가져감
+        self.record_round_metrics()
+
+        if self.archive is not None:
+            for player, (strokes, (score, text, _)) in enumerate(zip(self.submitted_strokes, results)):
+                self.archive.append(answer_kr, score, text, strokes, self.current_prompt_index, player)
+
+        lines = []
+        for player, (score, text, guesses) in enumerate(results):
+            line = f"{player + 1}번 친구: {score}점"
+            if text > 0.25:
+                line += " (글씨는 못 읽는다요!)"
+            if guesses is not None and guesses["top"]:
+                best = KOREAN_NAMES.get(guesses["top"][0][0], guesses["top"][0][0])
+                line += f" - 만디는 {best}(으)로 봤다요"
+            lines.append(line)
+
+        best_score = max(score for score, _, _ in results)
+        if best_score > 50:
+            self.success_count += 1
+            winners = [player for player, (score, _, _) in enumerate(results) if score == best_score]
+            for player in winners:
+                self.player_wins[player] += 1
+            lines.append("\n" + ", ".join(f"{player + 1}번" for player in winners) + " 친구 그림이 제일 잘 보인다요!")
+        else:
+            lines.append("\n미안하다요... 아무것도 잘 모르겠다요...")
+
+        messagebox.showinfo("만디의 생각", f"필요한 준비물: {answer_kr}\n\n" + "\n".join(lines))
+        self.check_button.config(text="만디에게 보여주기", state="normal")
+        self.lock_boards(False)
+        self.next_round()
 
+    def next_round(self):
         self.current_prompt_index += 1
 
         # 마지막 문제까지 다 풀었을 때
         if self.current_prompt_index >= len(self.prompts):
-            total_items = len(self.prompts)
-
-            # 최종 결과 메시지 구성
-            result_msg = f"총 {total_items}개의 준비물 중 {self.success_count}개를 챙겼다요!\n"
-            if self.success_count == total_items:
-                result_msg += "완벽하다요!"
-            elif self.success_count >= 4:
-                result_msg += "이 정도면 충분하다요! 출발하자요!"
-            else:
-                result_msg += "으음... 뭔가 많이 빠트린 것 같다요..."
-
-            play_again = messagebox.askyesno(
-                "게임 종료!",
-                f"{result_msg}\n\n게임을 다시 시작하겠다요?"
-            )
-
-            if play_again:
-                self.restart_game()
-            else:
-                self.root.destroy()
+            self.finish_game()
             return
 
         self.prompt_label.config(text=f"필요한 준비물: {self.prompts[self.current_prompt_index]}")
         self.reset_canvas()
 
+    def finish_game(self):
+        total_items = len(self.prompts)
+
+        # 최종 결과 메시지 구성
+        result_msg = f"총 {total_items}개의 준비물 중 {self.success_count}개를 챙겼다요!\n"
+        if self.success_count == total_items:
+            result_msg += "완벽하다요!"
+        elif self.success_count >= 4:
+            result_msg += "이 정도면 충분하다요! 출발하자요!"
+        else:
+            result_msg += "으음... 뭔가 많이 빠트린 것 같다요..."
+
+        # 함께 그리기면 친구별로 가장 잘 그린 라운드 수
+        if self.players > 1:
+            ranking = sorted(range(self.players), key=lambda player: -self.player_wins[player])
+            result_msg += "\n\n" + "\n".join(f"{player + 1}번 친구: {self.player_wins[player]}번 1등"
+                                                for player in ranking)
+
+        play_again = messagebox.askyesno(
+            "게임 종료!",
+            f"{result_msg}\n\n게임을 다시 시작하겠다요?"
+        )
+
+        if play_again:
+            self.restart_game()
+        else:
+            self.close()
+
 
 if __name__ == "__main__":
     root = tk.Tk()
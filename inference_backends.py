@@ -0,0 +1,86 @@
+import copy
+import os
+import torch
+
+# ====== 이미지 인코더 실행 방식 ======
+# "torch": 기존 fp32 PyTorch, "int8": 동적 int8 양자화 PyTorch, "onnx": ONNX Runtime (CPU)
+BACKEND_NAMES = ["torch", "int8", "onnx"]
+
+
+class VisionTower(torch.nn.Module):
+    # CLIP에서 이미지 쪽만 떼어낸 모듈 (pixel_values -> 정규화 전 이미지 임베딩)
+    def __init__(self, model):
+        super().__init__()
+        self.vision_model = model.vision_model
+        self.visual_projection = model.visual_projection
+
+    def forward(self, pixel_values):
+        return self.visual_projection(self.vision_model(pixel_values=pixel_values).pooler_output)
+
+
+class TorchBackend:
+    def __init__(self, model):
+        self.tower = VisionTower(model).eval()
+
+    def image_features(self, pixel_values):
+        with torch.no_grad():
+            return self.tower(pixel_values)
+
+
+class QuantizedTorchBackend(TorchBackend):
+    # Linear 층의 가중치를 int8로 바꿔서 CPU 연산을 줄임 (원본 모델은 그대로 둠)
+    def __init__(self, model):
+        tower = copy.deepcopy(VisionTower(model)).eval()
+        self.tower = torch.ao.quantization.quantize_dynamic(tower, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxBackend:
+    # 이미지 인코더를 ONNX로 한 번 내보내 두고 ONNX Runtime으로 실행
+    # threads, interop: 세션의 intra-op / inter-op 스레드 수 (None이면 ONNX Runtime 기본값)
+    # ONNX Runtime은 torch.set_num_threads를 따르지 않으므로 세션을 만들 때 정해야 함
+    def __init__(self, model, model_path, threads=None, interop=None):
+        import onnxruntime
+
+        if not os.path.exists(model_path):
+            export_onnx(model, model_path)
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        if interop:
+            options.inter_op_num_threads = interop
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+
+    def image_features(self, pixel_values):
+        outputs = self.session.run(None, {"pixel_values": pixel_values.numpy()})
+        return torch.from_numpy(outputs[0])
+
+
+def export_onnx(model, model_path):
+    print(f"ONNX 모델을 만드는 중입니다: {model_path}")
+    os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
+    tower = VisionTower(model).eval()
+    dummy = torch.zeros(1, 3, 224, 224)
+    kwargs = dict(input_names=["pixel_values"], output_names=["image_embeds"],
+                  dynamic_axes={"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}}, opset_version=17)
+    tmp_path = model_path + ".tmp"
+    try:
+        torch.onnx.export(tower, (dummy,), tmp_path, dynamo=False, **kwargs)
+    except TypeError:
+        # dynamo 옵션이 없는 예전 torch
+        torch.onnx.export(tower, (dummy,), tmp_path, **kwargs)
+    os.replace(tmp_path, model_path)
+
+
+def onnx_path(cache_dir, model_name):
+    return os.path.join(cache_dir, f"vision_{model_name.replace('/', '_')}.onnx")
+
+
+def make_backend(name, model, model_name, cache_dir, threads=None, interop=None):
+    # threads, interop은 onnx에만 적용 (torch 백엔드는 채점하는 스레드에서 torch.set_num_threads로 정함)
+    if name == "torch":
+        return TorchBackend(model)
+    if name == "int8":
+        return QuantizedTorchBackend(model)
+    if name == "onnx":
+        return OnnxBackend(model, onnx_path(cache_dir, model_name), threads, interop)
+    raise ValueError(f"알 수 없는 백엔드: {name} (가능한 값: {', '.join(BACKEND_NAMES)})")
@@ -0,0 +1,223 @@
+import bisect
+import cProfile
+import http.server
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+# ====== 시작 시간 측정 ======
+# 프로그램 시작부터 단계별(import, 모델, 배경 이미지, 음악, 첫 화면)로 언제 끝났는지 기록
+
+
+class StartupTimer:
+    # 여러 스레드에서 기록해도 되도록 lock 사용
+    def __init__(self, t0=None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.phases = []  # (이름, 시작 시각, 걸린 시간) - 시각은 t0 기준 초
+        self.lock = threading.Lock()
+
+    def record(self, name, start, seconds):
+        with self.lock:
+            self.phases.append((name, start - self.t0, seconds))
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter() - start)
+
+    def mark(self, name):
+        # 한 시점 기록 (예: 첫 화면이 그려진 때) - 시작부터 지금까지
+        self.record(name, self.t0, time.perf_counter() - self.t0)
+
+    def report(self):
+        with self.lock:
+            phases = sorted(self.phases, key=lambda phase: phase[1] + phase[2])
+        lines = ["[시작 시간]"]
+        for name, start, seconds in phases:
+            lines.append(f"  {name:<14} {start:6.2f}s -> {start + seconds:6.2f}s  ({seconds * 1000:.0f} ms)")
+        return "\n".join(lines)
+
+
+# ====== 채점 구간별 시간 (히스토그램) ======
+# 구간 경계 (ms) - 마지막 칸은 그보다 오래 걸린 경우
+HISTOGRAM_BUCKETS_MS = [0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+
+class Histogram:
+    # 값은 버리고 구간별 개수만 모음 (메모리가 늘지 않음), 백분위는 구간 경계로 근사
+    def __init__(self, buckets=HISTOGRAM_BUCKETS_MS):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = ms if self.max is None else max(self.max, ms)
+
+    def percentile(self, q):
+        # q% 번째 값이 들어있는 구간의 위쪽 경계 (마지막 칸이면 최댓값)
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum_ms": round(self.total, 3),
+            "mean_ms": round(self.total / self.count, 3) if self.count else None,
+            "min_ms": self.min,
+            "max_ms": self.max,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "buckets_ms": self.buckets,
+            "bucket_counts": list(self.counts)
+        }
+
+
+class Metrics:
+    # 이름별 히스토그램과 누적 카운터 (채점 스레드, UI 스레드에서 같이 기록)
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()  # 스레드별 카운터 이름 앞부분 (counter_prefix)
+        self.started = time.time()
+
+    def observe(self, name, ms):
+        with self.lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram()
+            self.histograms[name].observe(ms)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000)
+
+    @contextmanager
+    def counter_prefix(self, prefix):
+        # 이 스레드에서 올리는 카운터 이름 앞에 prefix를 붙임 (예: 미리 채점은 speculative_images_encoded로 따로)
+        previous = getattr(self.local, "prefix", "")
+        self.local.prefix = prefix
+        try:
+            yield
+        finally:
+            self.local.prefix = previous
+
+    def increment(self, name, n=1):
+        name = getattr(self.local, "prefix", "") + name
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "started": self.started,
+                "time": time.time(),
+                "counters": dict(self.counters),
+                "histograms": {name: hist.snapshot() for name, hist in self.histograms.items()}
+            }
+
+    def write_json(self, path):
+        # 다른 프로그램이 읽는 중에 반쯤 쓴 파일을 보지 않도록 임시 파일에 쓴 뒤 교체
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def summary(self):
+        lines = []
+        for name, hist in sorted(self.snapshot()["histograms"].items()):
+            lines.append(f"  {name:<14} {hist['count']:5d}회  평균 {hist['mean_ms']:8.1f} ms  "
+                         f"p95 {hist['p95_ms']:8.1f} ms")
+        return "\n".join(lines)
+
+
+# 프로그램 전체에서 같이 쓰는 기록 (ai_scorer, 게임 화면, 서버가 여기에 기록)
+METRICS = Metrics()
+
+
+# ====== 기록 보기 (로컬 HTTP) ======
+class MetricsRequestHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = json.dumps(self.server.metrics.snapshot(), ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # 요청마다 콘솔에 찍지 않음
+
+
+def serve_metrics(port, metrics=METRICS, host="127.0.0.1"):
+    # 백그라운드 스레드에서 http://host:port/metrics 로 JSON 제공
+    server = http.server.ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    server.daemon_threads = True
+    server.metrics = metrics
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ====== 한 라운드 프로파일링 ======
+PROFILE_MODES = ["cprofile", "torch"]
+
+
+@contextmanager
+def profile_round(mode, output_dir, name):
+    # mode가 비어 있으면 아무것도 하지 않음
+    # cprofile: output_dir/<name>-<시각>.prof 저장 + 상위 함수 출력 (python -m pstats, snakeviz로 열기)
+    # torch: output_dir/<name>-<시각>.json 크롬 트레이스 저장 (chrome://tracing, perfetto로 열기)
+    if not mode:
+        yield
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"알 수 없는 프로파일 방식: {mode} ({', '.join(PROFILE_MODES)})")
+
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.join(output_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}")
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(stem + ".prof")
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+            print(f"프로파일 저장: {stem}.prof")
+    else:
+        import torch.profiler
+
+        with torch.profiler.profile(activities=[torch.profiler.ProfilerActivity.CPU], record_shapes=True) as prof:
+            yield
+        prof.export_chrome_trace(stem + ".json")
+        print(prof.key_averages().table(sort_by="self_cpu_time_total", row_limit=15))
+        print(f"프로파일 저장: {stem}.json")
@@ -0,0 +1,241 @@
+import argparse
+import json
+import os
+import sys
+import time
+import torch
+from ai_scorer import (CACHE_DIR, FIXED_PROMPTS, MODEL_NAME, TEXT_PENALTY_THRESHOLD, WORD_TEMPLATES, ClipScorer,
+                       compute_score, load_templates, score_tier)
+from prompts import PROMPT_MAP
+from session_log import encode_deltas, load_strokes, read_archive
+from synthetic import CORPUS_VERSION, synthetic_corpus
+
+# ====== 점수 비교(기준 결과 고정) 설정 ======
+# 기준 파이프라인으로 그림 묶음의 확률, 점수를 한 번 기록해 두고(golden),
+# 빠른 채점 방식(양자화, 자르기, 캐시, 배치 등)을 바꿀 때마다 같은 그림에서 판정이 바뀌는지 확인
+GOLDEN_VERSION = 1
+GOLDEN_PATH = os.path.join("parity", "golden.json")
+REFERENCE = "reference"  # 예전 calculate_ai_score 그대로 (전체 캔버스 + CLIPProcessor + 모델 전체 forward)
+# 게임이 모델 없이 최저점을 주는 그림(빈 종이, 점 하나, 직선 하나)의 확률: 전부 [5] "blank white paper"
+# -> compute_score가 MIN_SCORE, 글씨 확률 0, 페널티 없음을 돌려줌
+TRIVIAL_PROBS = [0.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+
+
+# ====== 채점 파이프라인 ======
+class ReferencePipeline:
+    # 최적화 전 채점 방식: 매번 프롬프트 6개를 토큰화해서 모델 전체를 통과
+    def __init__(self, model, processor):
+        self.model = model
+        self.processor = processor
+
+    def predict_probs(self, strokes, word_en):
+        prompts = [template.format(word_en) for template in WORD_TEMPLATES] + FIXED_PROMPTS
+        inputs = self.processor(text=prompts, images=strokes.render_full(), return_tensors="pt", padding=True)
+        with torch.no_grad():
+            outputs = self.model(**inputs)
+        return outputs.logits_per_image.softmax(dim=1)[0].tolist()
+
+
+class ScorerPipeline:
+    # 지금 게임이 쓰는 ClipScorer (백엔드, 전처리 조합), 결과 캐시는 끔
+    # skip_trivial: 게임처럼 빈 종이, 점 하나, 직선 하나는 모델 없이 최저점 (이 지름길이 바꾼 판정도 비교에 들어감)
+    def __init__(self, model, processor, words, backend, preprocess, model_name=MODEL_NAME, cache_dir=CACHE_DIR,
+                 templates=None, skip_trivial=True):
+        self.preprocess = preprocess
+        self.skip_trivial = skip_trivial
+        self.scorer = ClipScorer(model, processor, words, model_name, backend, cache_dir, preprocess, cache=False,
+                                 templates=templates)
+
+    def predict_probs(self, strokes, word_en):
+        if self.skip_trivial and strokes.trivial_reason() is not None:
+            return list(TRIVIAL_PROBS)
+        image = strokes.render_square() if self.preprocess == "crop" else strokes.render_full()
+        return self.scorer.predict_probs(image, word_en)
+
+
+def make_pipeline(spec, model, processor, words, model_name=MODEL_NAME, cache_dir=CACHE_DIR, skip_trivial=True):
+    # spec: "reference" 또는 "백엔드:전처리[:템플릿]" (예: "torch:crop", "int8:crop", "torch:crop:ensemble")
+    # 기준 파이프라인은 예전처럼 모든 그림을 모델로 채점, 나머지는 게임과 같게 빈 그림 지름길 포함 (skip_trivial)
+    if spec == REFERENCE:
+        return ReferencePipeline(model, processor)
+    backend, preprocess, templates = (spec.split(":", 2) + ["", ""])[:3]
+    return ScorerPipeline(model, processor, words, backend, preprocess or "crop", model_name, cache_dir,
+                          load_templates(templates), skip_trivial)
+
+
+# ====== 비교할 그림 묶음 ======
+def encode_strokes(strokes):
+    # 기록 파일(session_log)과 같은 형식으로 기준 결과 안에 그림도 같이 저장
+    return {"canvas": [strokes.width, strokes.height],
+            "strokes": [{"xy": encode_deltas(points, "h"), "t": encode_deltas(times, "i")}
+                        for points, times in zip(strokes.strokes, strokes.times)]}
+
+
+def load_corpus(archives=None, limit=None):
+    # 기록 파일을 주면 실제 아이들이 그린 그림, 아니면 합성 그림 (name, 제시어, StrokeStore) 목록
+    if not archives:
+        corpus = synthetic_corpus()
+    else:
+        corpus = []
+        for path in archives:
+            for i, record in enumerate(read_archive(path)):
+                name = f"{os.path.basename(path)}:{i}"
+                corpus.append((name, record["word"], load_strokes(record)))
+    return corpus[:limit] if limit else corpus
+
+
+# ====== 채점 결과 ======
+def evaluate(probs):
+    score, text_prob, penalized = compute_score(probs)
+    return {"probs": probs, "score": score, "text_prob": text_prob, "penalized": penalized,
+            "tier": score_tier(score), "text_flag": text_prob > TEXT_PENALTY_THRESHOLD}
+
+
+def run_pipeline(pipeline, samples):
+    results = []
+    for name, word, strokes in samples:
+        probs = pipeline.predict_probs(strokes, PROMPT_MAP.get(word, "object"))
+        results.append({"name": name, "word": word, **evaluate(probs)})
+    return results
+
+
+def record_golden(pipeline_spec, model, processor, corpus, model_name=MODEL_NAME, cache_dir=CACHE_DIR,
+                  source="synthetic", skip_trivial=True):
+    words = sorted({PROMPT_MAP.get(word, "object") for _, word, _ in corpus})
+    pipeline = make_pipeline(pipeline_spec, model, processor, words, model_name, cache_dir, skip_trivial)
+    samples = []
+    for (name, word, strokes), result in zip(corpus, run_pipeline(pipeline, corpus)):
+        result.update(encode_strokes(strokes))
+        result["trivial"] = strokes.trivial_reason()  # 게임에서는 모델 없이 최저점을 주는 그림
+        samples.append(result)
+    return {
+        "version": GOLDEN_VERSION,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "model": model_name,
+        "pipeline": pipeline_spec,
+        "source": source,
+        "corpus_version": CORPUS_VERSION if source == "synthetic" else None,
+        "torch": torch.__version__,
+        "samples": samples
+    }
+
+
+def compare_golden(golden, pipeline_spec, model, processor, model_name=MODEL_NAME, cache_dir=CACHE_DIR,
+                   skip_trivial=True):
+    # 기준 결과와 같은 그림을 다른 파이프라인으로 채점해서 그림마다 차이와 판정 변화를 정리
+    corpus = [(sample["name"], sample["word"], load_strokes(sample)) for sample in golden["samples"]]
+    words = sorted({PROMPT_MAP.get(word, "object") for _, word, _ in corpus})
+    pipeline = make_pipeline(pipeline_spec, model, processor, words, model_name, cache_dir, skip_trivial)
+
+    rows = []
+    for ref, result in zip(golden["samples"], run_pipeline(pipeline, corpus)):
+        rows.append({
+            "name": ref["name"],
+            "word": ref["word"],
+            "trivial": ref.get("trivial"),
+            "prob_drift": max(abs(a - b) for a, b in zip(ref["probs"], result["probs"])),
+            "ref_score": ref["score"],
+            "score": result["score"],
+            "score_diff": result["score"] - ref["score"],
+            "tier_flip": ref["tier"] != result["tier"],
+            "text_flip": ref["text_flag"] != result["text_flag"],
+            "penalty_flip": ref["penalized"] != result["penalized"]
+        })
+
+    drifts = [row["prob_drift"] for row in rows]
+    return {
+        "pipeline": pipeline_spec,
+        "reference": golden["pipeline"],
+        "samples": len(rows),
+        "max_prob_drift": max(drifts, default=0.0),
+        "mean_prob_drift": sum(drifts) / len(drifts) if drifts else 0.0,
+        "max_score_diff": max((abs(row["score_diff"]) for row in rows), default=0),
+        "tier_flips": sum(row["tier_flip"] for row in rows),
+        "text_flips": sum(row["text_flip"] for row in rows),
+        "penalty_flips": sum(row["penalty_flip"] for row in rows),
+        "rows": rows
+    }
+
+
+def print_report(report, show=10):
+    print(f"[{report['pipeline']} vs {report['reference']}] 그림 {report['samples']}장")
+    print(f"  확률 차이: 최대 {report['max_prob_drift']:.4f}, 평균 {report['mean_prob_drift']:.4f}")
+    print(f"  점수 차이: 최대 {report['max_score_diff']}점")
+    print(f"  판정(실패/성공/완벽)이 바뀐 그림: {report['tier_flips']}장, "
+          f"글씨 경고가 바뀐 그림: {report['text_flips']}장, 페널티가 바뀐 그림: {report['penalty_flips']}장")
+
+    changed = [row for row in report["rows"] if row["tier_flip"] or row["text_flip"] or row["penalty_flip"]]
+    worst = sorted(report["rows"], key=lambda row: -row["prob_drift"])
+    for row in (changed or worst)[:show]:
+        flags = [flag for flag in ("tier", "text", "penalty") if row[f"{flag}_flip"]]
+        note = f" (게임에서는 채점 생략: {row['trivial']})" if row["trivial"] else ""
+        print(f"  {row['name']} [{row['word']}]: {row['ref_score']}점 -> {row['score']}점, "
+              f"확률 차이 {row['prob_drift']:.4f} {' '.join(flags)}{note}")
+
+
+# ====== 모델 (인터넷 없이 로컬에 받아둔 모델만 사용) ======
+def load_offline_model(model_name=MODEL_NAME):
+    # transformers를 불러오기 전에 설정해야 Hugging Face Hub에 접속하지 않음
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+    from transformers import CLIPProcessor, CLIPModel
+
+    model = CLIPModel.from_pretrained(model_name, local_files_only=True)
+    processor = CLIPProcessor.from_pretrained(model_name, local_files_only=True)
+    return model.eval(), processor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="채점 방식을 바꿔도 아이들이 받는 판정이 그대로인지 확인")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record = sub.add_parser("record", help="기준 결과 기록")
+    record.add_argument("--pipeline", default=REFERENCE, help="reference 또는 백엔드:전처리 (예: torch:crop)")
+    record.add_argument("--archive", nargs="*", help="그림 기록 파일 (없으면 합성 그림 사용)")
+    record.add_argument("--limit", type=int, default=None)
+
+    check = sub.add_parser("check", help="기준 결과와 비교")
+    check.add_argument("pipelines", nargs="+", help="비교할 파이프라인 (예: torch:crop int8:crop onnx:crop)")
+    check.add_argument("--report", default=None, help="그림별 결과를 JSON으로 저장")
+    check.add_argument("--show", type=int, default=10, help="출력할 그림 수")
+
+    for p in (record, check):
+        p.add_argument("--golden", default=GOLDEN_PATH)
+        p.add_argument("--no-trivial-skip", action="store_true",
+                       help="빈 종이, 점 하나, 직선 하나도 모델로 채점 (게임의 최저점 지름길을 빼고 비교)")
+        p.add_argument("--model", default=MODEL_NAME, help="모델 이름 또는 로컬 폴더")
+    args = parser.parse_args()
+
+    model, processor = load_offline_model(args.model)
+
+    if args.command == "record":
+        corpus = load_corpus(args.archive, args.limit)
+        golden = record_golden(args.pipeline, model, processor, corpus, args.model,
+                               source="archive" if args.archive else "synthetic",
+                               skip_trivial=not args.no_trivial_skip)
+        os.makedirs(os.path.dirname(args.golden) or ".", exist_ok=True)
+        with open(args.golden, "w", encoding="utf-8") as f:
+            json.dump(golden, f, ensure_ascii=False)
+        print(f"기준 결과 저장: {args.golden} (그림 {len(corpus)}장, {args.pipeline})")
+        return
+
+    with open(args.golden, encoding="utf-8") as f:
+        golden = json.load(f)
+    if golden.get("version") != GOLDEN_VERSION or golden.get("model") != args.model:
+        sys.exit("기준 결과의 형식이나 모델이 다릅니다. record로 다시 기록하세요.")
+
+    reports = [compare_golden(golden, spec, model, processor, args.model, skip_trivial=not args.no_trivial_skip)
+               for spec in args.pipelines]
+    for report in reports:
+        print_report(report, args.show)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+
+    # 판정(점수 구간, 글씨 경고, 글씨 페널티)이 하나라도 바뀌면 실패 코드로 종료 (배포 전 확인용)
+    if any(report["tier_flips"] or report["text_flips"] or report["penalty_flips"] for report in reports):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
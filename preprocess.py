@@ -0,0 +1,61 @@
+from PIL import Image
+
+# ====== CLIP 입력 설정 (openai/clip-vit-base-patch32 의 전처리 값) ======
+CLIP_SIZE = 224
+CLIP_MEAN = (0.48145466, 0.4578275, 0.40821073)
+CLIP_STD = (0.26862954, 0.26130258, 0.27577711)
+
+# ====== 그림 영역 자르기 설정 ======
+CROP_PADDING = 20  # 그림 테두리 바깥으로 남길 여백 (px)
+MIN_CROP_SIDE = 150  # 점 하나처럼 아주 작은 그림이 과하게 확대되지 않도록 하는 최소 크기 (px)
+
+
+def crop_box(bbox, width, height):
+    # 그린 영역(bbox)에 여백을 붙이고, 너무 작으면 최소 크기까지 넓힌 뒤 캔버스 안으로 제한
+    if bbox is None:
+        return 0, 0, width, height
+
+    x0, y0, x1, y1 = bbox
+    x0, y0, x1, y1 = x0 - CROP_PADDING, y0 - CROP_PADDING, x1 + CROP_PADDING, y1 + CROP_PADDING
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    half_w = max(x1 - x0, MIN_CROP_SIDE) / 2
+    half_h = max(y1 - y0, MIN_CROP_SIDE) / 2
+    return (max(0, int(cx - half_w)), max(0, int(cy - half_h)),
+            min(width, int(cx + half_w + 1)), min(height, int(cy + half_h + 1)))
+
+
+def ink_bbox(image, threshold=200):
+    # 저장된 그림 파일에서 선이 있는 영역 찾기 (흰 바탕 기준, 아무것도 없으면 None)
+    return image.convert("L").point(lambda v: 255 if v < threshold else 0).getbbox()
+
+
+def letterbox(image, bbox=None, size=CLIP_SIZE):
+    # 그림 영역만 잘라서 비율을 유지한 채 size x size 흰 바탕 가운데에 놓음
+    # (CLIPProcessor의 center crop처럼 가장자리 그림이 잘려나가지 않음)
+    region = image.crop(crop_box(bbox, image.width, image.height))
+    scale = size / max(region.width, region.height)
+    resized = region.resize((max(1, round(region.width * scale)), max(1, round(region.height * scale))),
+                            Image.BICUBIC)
+
+    square = Image.new("RGB", (size, size), "white")
+    square.paste(resized, ((size - resized.width) // 2, (size - resized.height) // 2))
+    return square
+
+
+def to_pixel_values(images, size=CLIP_SIZE):
+    # size x size RGB 이미지들 -> 정규화된 (배치, 3, size, size) 텐서 (CLIPProcessor 대신 NumPy로 한 번에 계산)
+    # numpy, torch는 여기서 불러옴 (게임 화면이 StrokeStore를 쓰려고 이 모듈을 import할 때 같이 불러오지 않도록)
+    import numpy as np
+    import torch
+
+    squares = []
+    for image in images:
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        if image.size != (size, size):
+            image = letterbox(image, None, size)
+        squares.append(np.asarray(image, dtype=np.float32))
+
+    batch = np.stack(squares)
+    batch = (batch / 255.0 - np.array(CLIP_MEAN, dtype=np.float32)) / np.array(CLIP_STD, dtype=np.float32)
+    return torch.from_numpy(np.ascontiguousarray(batch.transpose(0, 3, 1, 2)))
@@ -0,0 +1,21 @@
+# ====== 전체 제시어 ======
+ALL_PROMPTS = [
+    "사과", "고양이", "사다리", "나무", "자동차", "부엉이", "의자", "전기톱", "폭탄", "딸기", "검", "황소", "도마뱀",
+    "물고기", "강아지", "꽃", "비행기", "컵", "칫솔", "바나나", "알약", "우주왕복선", "고기", "장갑", "화염방사기", "용",
+    "스마트폰", "텔레비전", "조개", "문어", "연필", "건전지", "쇠사슬", "빵", "교회", "거미", "무량공처", "벽돌", "탄산음료",
+    "전구", "독수리", "활", "헬리콥터", "배", "캥거루", "운동화", "책"
+]
+
+PROMPT_MAP = {
+    "사과": "apple", "바나나": "banana", "고양이": "cat", "딸기": "strawberry", "폭탄": "boom", "장갑": "glove",
+    "사다리": "ladder", "나무": "tree", "자동차": "car", "의자": "chair", "고기": "meat", "총": "gun", "검": "sword",
+    "부엉이": "owl", "전기톱": "chainsaw", "물고기": "fish", "강아지": "puppy", "꽃": "flower", "조개": "clam",
+    "비행기": "airplane", "컵": "cup", "칫솔": "toothbrush", "알약": "pill", "우주왕복선": "Space Shuttle", "황소": "bull",
+    "화염방사기": "flamethrower", "도마뱀": "lizard", "용(드래곤)": "dragon", "스마트폰": "smartphone", "텔레비전": "TV",
+    "문어": "octopus", "연필": "pencil", "건전지": "battery", "쇠사슬": "chain", "빵": "bread", "교회": "church",
+    "거미": "spider", "[무량공처]": "Satoru Gojo", "벽돌": "brick", "탄산음료": "soda", "전구": "light", "독수리": "eagle",
+    "활": "arrow", "헬리콥터": "helicopter", "배(선박)": "ship", "캥거루": "kangaroo", "운동화": "sneakers", "책": "book"
+}
+
+# 영어 단어 -> 화면에 보여줄 한국어 이름 ("만디가 생각한 것" 표시용)
+KOREAN_NAMES = {en: kr for kr, en in PROMPT_MAP.items()}
@@ -0,0 +1,239 @@
+import argparse
+import json
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from PIL import Image
+
+# ====== 채점 서버 설정 ======
+# 여러 PaintGame 창이 모델 하나를 같이 쓰도록, 로컬 서버가 그림을 모아서 한 번에 채점
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 50051
+BATCH_WINDOW_MS = 20  # 첫 요청이 온 뒤 이 시간 동안 들어온 요청을 한 배치로 묶음
+MAX_BATCH = 16
+
+# 메시지 형식: [헤더 길이 4바이트][JSON 헤더][데이터 길이 4바이트][데이터]
+LENGTH = struct.Struct("!I")
+
+
+def send_message(sock, header, payload=b""):
+    header_bytes = json.dumps(header).encode("utf-8")
+    sock.sendall(LENGTH.pack(len(header_bytes)) + header_bytes + LENGTH.pack(len(payload)) + payload)
+
+
+def recv_exact(sock, size):
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("채점 서버 연결이 끊어졌습니다.")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock):
+    header = json.loads(recv_exact(sock, LENGTH.unpack(recv_exact(sock, LENGTH.size))[0]))
+    payload = recv_exact(sock, LENGTH.unpack(recv_exact(sock, LENGTH.size))[0])
+    return header, payload
+
+
+# ====== 클라이언트 (PaintGame 쪽) ======
+def parse_address(address):
+    # "호스트:포트", "호스트", ":포트" 모두 허용 (빠진 쪽은 기본값), 잘못된 값이면 ValueError
+    host, sep, port = address.strip().rpartition(":")
+    if not sep:
+        host, port = port, ""
+    try:
+        port = int(port) if port else DEFAULT_PORT
+    except ValueError:
+        port = -1
+    if not 0 < port < 65536:
+        raise ValueError(f"채점 서버 주소가 잘못되었습니다: {address!r} (예: {DEFAULT_HOST}:{DEFAULT_PORT})")
+    return host or DEFAULT_HOST, port
+
+
+class RemoteScorer:
+    # ClipScorer.predict_probs와 같은 모양으로 채점 서버에 요청
+    # preprocess: 이 PC의 전처리 설정 (요청마다 보내고, 서버 설정과 다르면 서버가 거절)
+    def __init__(self, address, timeout=10.0, preprocess=None):
+        self.address = parse_address(address)
+        self.timeout = timeout
+        self.preprocess = preprocess
+        self.sock = None
+        self.lock = threading.Lock()
+
+    def request(self, header, payload=b""):
+        if self.preprocess is not None:
+            header = {**header, "preprocess": self.preprocess}
+        with self.lock:
+            try:
+                if self.sock is None:
+                    self.sock = socket.create_connection(self.address, timeout=self.timeout)
+                send_message(self.sock, header, payload)
+                reply, _ = recv_message(self.sock)
+            except OSError:
+                self.close()
+                raise
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply
+
+    def ping(self):
+        try:
+            self.request({"type": "ping"})
+            return True
+        except OSError:
+            return False
+        except RuntimeError as e:
+            print(f"채점 서버가 요청을 거절했습니다: {e}")
+            return False
+
+    def predict_probs(self, image, word_en):
+        image = image.convert("RGB")
+        header = {"type": "score", "word": word_en, "width": image.width, "height": image.height}
+        return self.request(header, image.tobytes())["probs"]
+
+    def predict_probs_batch(self, images, words_en):
+        # 여러 그림(함께 그리기)을 요청 하나로 보내서 서버에서 같은 배치로 채점
+        images = [image.convert("RGB") for image in images]
+        header = {"type": "score_batch", "words": list(words_en), "sizes": [image.size for image in images]}
+        return self.request(header, b"".join(image.tobytes() for image in images))["probs"]
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+
+# ====== 서버 ======
+class MicroBatcher:
+    # 짧은 시간 창 안에 들어온 요청들을 모아서 predict_probs_batch 한 번으로 처리
+    # 요청 하나에 들어온 여러 그림(함께 그리기)은 나누지 않고 항상 같은 배치에 넣음
+    def __init__(self, scorer, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH):
+        self.scorer = scorer
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.requests = queue.Queue()
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def predict_probs(self, image, word_en):
+        return self.predict_probs_batch([image], [word_en])[0]
+
+    def predict_probs_batch(self, images, words_en):
+        future = Future()
+        self.requests.put((list(images), list(words_en), future))
+        return future.result()
+
+    def run(self):
+        while True:
+            batch = [self.requests.get()]
+            count = len(batch[0][0])
+            deadline = time.monotonic() + self.window
+            while count < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self.requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                count += len(request[0])
+
+            images = [image for request in batch for image in request[0]]
+            words = [word for request in batch for word in request[1]]
+            try:
+                results = self.scorer.predict_probs_batch(images, words)
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            start = 0
+            for request_images, _, future in batch:
+                future.set_result(results[start:start + len(request_images)])
+                start += len(request_images)
+
+
+class ScoreRequestHandler(socketserver.BaseRequestHandler):
+    # 연결 하나당 스레드 하나, 연결이 끊길 때까지 요청을 계속 받음
+    def handle(self):
+        while True:
+            try:
+                header, payload = recv_message(self.request)
+            except (ConnectionError, OSError):
+                return
+
+            try:
+                # 전처리가 다르면 같은 그림도 점수가 달라지므로 (예: 서버 crop, 이 PC processor) 채점하지 않음
+                preprocess = header.get("preprocess", self.server.preprocess)
+                if self.server.preprocess is not None and preprocess != self.server.preprocess:
+                    reply = {"error": f"전처리 설정이 다릅니다 (서버: {self.server.preprocess}, 요청: {preprocess})"}
+                elif header.get("type") == "ping":
+                    reply = {"ok": True}
+                elif header.get("type") == "score_batch":
+                    images = []
+                    offset = 0
+                    for width, height in header["sizes"]:
+                        size = width * height * 3
+                        images.append(Image.frombytes("RGB", (width, height), payload[offset:offset + size]))
+                        offset += size
+                    reply = {"probs": self.server.batcher.predict_probs_batch(images, header["words"])}
+                else:
+                    image = Image.frombytes("RGB", (header["width"], header["height"]), payload)
+                    reply = {"probs": self.server.batcher.predict_probs(image, header["word"])}
+            except Exception as e:
+                reply = {"error": str(e)}
+            send_message(self.request, reply)
+
+
+class ScoreServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, batcher, preprocess=None):
+        super().__init__(address, ScoreRequestHandler)
+        self.batcher = batcher
+        self.preprocess = preprocess
+
+
+def main():
+    parser = argparse.ArgumentParser(description="여러 PaintGame이 함께 쓰는 CLIP 채점 서버")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--window-ms", type=float, default=BATCH_WINDOW_MS)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--backend", default="torch", help="torch, int8, onnx")
+    parser.add_argument("--preprocess", default="crop", choices=["crop", "processor"],
+                        help="채점 전처리 (게임 쪽 MANDI_PREPROCESS와 같아야 함, 다르면 요청을 거절)")
+    parser.add_argument("--model", default=None, help="모델 이름 또는 로컬 폴더 (기본: 게임과 같은 모델)")
+    parser.add_argument("--templates", default=None, help="그림 프롬프트 템플릿 (ensemble 또는 JSON 파일)")
+    parser.add_argument("--metrics-port", type=int, default=0, help="0보다 크면 이 포트로 성능 기록(JSON) 제공")
+    args = parser.parse_args()
+
+    from ai_scorer import MODEL_NAME, load_scorer, load_templates
+    from metrics import serve_metrics
+
+    if args.metrics_port > 0:
+        serve_metrics(args.metrics_port)
+        print(f"성능 기록: http://127.0.0.1:{args.metrics_port}/metrics")
+
+    print("AI 모델을 로딩 중입니다... 잠시만 기다려주세요.")
+    scorer = load_scorer(args.model or MODEL_NAME, args.backend, args.preprocess,
+                         templates=load_templates(args.templates))
+    # 첫 요청이 느리지 않도록 요청을 받기 전에 가짜 그림으로 미리 채점
+    times = scorer.warm_up()
+    print("워밍업 완료: " + " -> ".join(f"{ms:.0f} ms" for ms in times))
+
+    batcher = MicroBatcher(scorer, args.window_ms, args.max_batch)
+    with ScoreServer((args.host, args.port), batcher, args.preprocess) as server:
+        print(f"채점 서버 실행 중: {args.host}:{args.port} (전처리 {args.preprocess})")
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
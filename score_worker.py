@@ -0,0 +1,55 @@
+import itertools
+import queue
+import threading
+
+
+class ScoreJob:
+    # 채점 작업 하나 (결과는 작업 스레드가 채워 넣음)
+    def __init__(self, job_id, func, args):
+        self.job_id = job_id
+        self.func = func
+        self.args = args
+        self.cancelled = False
+        self.result = None
+        self.error = None
+
+    def cancel(self):
+        # 아직 시작 전이면 건너뛰고, 실행 중이면 결과를 버림
+        self.cancelled = True
+
+
+class ScoreWorker:
+    # 채점을 별도 스레드에서 하나씩 처리하고, 결과는 Tk 쪽에서 poll()로 가져감
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.job_ids = itertools.count(1)
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def submit(self, func, *args):
+        job = ScoreJob(next(self.job_ids), func, args)
+        self.jobs.put(job)
+        return job
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job.cancelled:
+                continue
+            try:
+                job.result = job.func(*job.args)
+            except Exception as e:
+                job.error = e
+            if not job.cancelled:
+                self.results.put(job)
+
+    def poll(self):
+        # 끝난 작업 목록 (취소된 작업은 제외), Tk 메인 스레드에서 root.after로 호출
+        done = []
+        while True:
+            try:
+                job = self.results.get_nowait()
+            except queue.Empty:
+                return done
+            if not job.cancelled:
+                done.append(job)
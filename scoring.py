@@ -0,0 +1,88 @@
+from metrics import METRICS
+
+# ====== 점수 기준 (torch 없이 쓸 수 있는 부분) ======
+# 채점 서버를 쓰는 게임 창은 ai_scorer(torch, numpy, 백엔드)를 불러오지 않고 여기 있는 것만 사용
+
+# ====== 모델 설정 ======
+MODEL_NAME = "openai/clip-vit-base-patch32"
+
+# ====== 점수 기준 ======
+TEXT_PENALTY_THRESHOLD = 0.25  # 글씨 확률이 이보다 크면 페널티
+MIN_SCORE = 10  # 최저 점수 (빈 종이, 점 하나 등)
+PASS_SCORE = 50  # 이 점수를 넘으면 성공
+GREAT_SCORE = 85  # 이 점수를 넘으면 "완벽"
+
+
+# ====== 점수 계산 ======
+def compute_score(probs):
+    # probs: 6개 프롬프트의 확률 -> (최종 점수, 글씨 확률, 글씨 페널티 여부)
+    prob_drawing = probs[0]
+    prob_word_text = probs[1]
+    prob_general_text = probs[2] + probs[3]
+
+    total_text_prob = prob_word_text + prob_general_text
+
+    final_score = int(prob_drawing * 100)
+
+    # 글씨 감지 시 페널티 적용
+    penalized = total_text_prob > prob_drawing or total_text_prob > TEXT_PENALTY_THRESHOLD
+    if penalized:
+        final_score = min(20, int(final_score * 0.2))
+
+    if final_score < MIN_SCORE: final_score = MIN_SCORE
+    if final_score > 98: final_score = 100
+
+    return final_score, total_text_prob, penalized
+
+
+def score_tier(score):
+    # check_answer의 메시지 구간 (0: 실패, 1: 성공, 2: 완벽)
+    if score > GREAT_SCORE:
+        return 2
+    if score > PASS_SCORE:
+        return 1
+    return 0
+
+
+# ====== 그림 채점 순서 (게임과 벤치마크가 같이 사용) ======
+def render_strokes(strokes, preprocess="crop"):
+    # crop 모드면 그린 영역만 224x224로, 아니면 전체 캔버스 크기로 그림
+    return strokes.render_square() if preprocess == "crop" else strokes.render_full()
+
+
+def predict_images(scorer, images, words_en, guesses=False, k=None):
+    # 그림마다 (확률, 만디의 생각)
+    # guesses: 직접 불러온 모델이면 전체 제시어 순위도 같이 계산 (그림 인코딩은 한 번), 채점 서버는 점수용 확률만
+    if guesses and hasattr(scorer, "predict_with_guesses_batch"):
+        if k is None:
+            return scorer.predict_with_guesses_batch(images, words_en)
+        return scorer.predict_with_guesses_batch(images, words_en, k)
+    if hasattr(scorer, "predict_probs_batch"):
+        return [(probs, None) for probs in scorer.predict_probs_batch(images, words_en)]
+    return [(scorer.predict_probs(image, word), None) for image, word in zip(images, words_en)]
+
+
+def score_strokes(scorer, strokes_list, words_en, preprocess="crop", guesses=False, k=None):
+    # 빈 그림 판별 -> 래스터화 -> 이미지 인코딩(여러 장을 한 번에) -> 점수
+    # -> 그림마다 {"score", "text_prob", "penalized", "probs", "guesses", "trivial"}
+    # 빈 종이, 점 하나, 직선 하나는 모델을 돌리지 않고 바로 최저점 ("trivial"에 이유)
+    results = [None] * len(strokes_list)
+    todo = []
+    for i, strokes in enumerate(strokes_list):
+        reason = strokes.trivial_reason()
+        if reason is not None:
+            results[i] = {"score": MIN_SCORE, "text_prob": 0.0, "penalized": False, "probs": None,
+                          "guesses": None, "trivial": reason}
+        else:
+            todo.append(i)
+    if not todo:
+        return results
+
+    with METRICS.timer("render"):
+        images = [render_strokes(strokes_list[i], preprocess) for i in todo]
+    predictions = predict_images(scorer, images, [words_en[i] for i in todo], guesses, k)
+    for i, (probs, word_guesses) in zip(todo, predictions):
+        score, text_prob, penalized = compute_score(probs)
+        results[i] = {"score": score, "text_prob": text_prob, "penalized": penalized, "probs": probs,
+                      "guesses": word_guesses, "trivial": None}
+    return results
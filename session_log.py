@@ -0,0 +1,152 @@
+import argparse
+import base64
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from array import array
+from strokes import StrokeStore
+
+# ====== 그림 기록 설정 ======
+# 제출한 그림(획 좌표, 시각, 제시어, 점수)을 한 줄에 하나씩 JSON으로 계속 이어 붙임
+ARCHIVE_VERSION = 1
+FSYNC_EVERY = 10  # 이 개수만큼 쌓이면 디스크에 확실히 기록 (fsync)
+FSYNC_INTERVAL = 30.0  # 마지막 fsync 후 이 시간(초)이 지나도 기록
+
+
+# ====== 획 좌표 인코딩 (첫 값 + 차이값을 little-endian 바이트로 만든 뒤 base64) ======
+def encode_deltas(values, typecode):
+    deltas = array(typecode, values)
+    step = 2 if typecode == "h" else 1  # 좌표는 x, y 번갈아 있으므로 두 칸 전과의 차이
+    for i in range(len(deltas) - 1, step - 1, -1):
+        deltas[i] -= deltas[i - step]
+    if sys.byteorder == "big":
+        deltas.byteswap()
+    return base64.b64encode(deltas.tobytes()).decode("ascii")
+
+
+def decode_deltas(text, typecode):
+    values = array(typecode)
+    values.frombytes(base64.b64decode(text))
+    if sys.byteorder == "big":
+        values.byteswap()
+    step = 2 if typecode == "h" else 1
+    for i in range(step, len(values)):
+        values[i] += values[i - step]
+    return values
+
+
+class SessionArchive:
+    # 추가만 하는 기록 파일 (매번 flush, fsync는 여러 개를 모아서)
+    def __init__(self, path, session_id=None):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.session_id = session_id or time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+        self.file = open(path, "a", encoding="utf-8")
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def append(self, word, score, text_prob, strokes, round_index=None, player=None):
+        record = {
+            "v": ARCHIVE_VERSION,
+            "session": self.session_id,
+            "round": round_index,
+            "time": round(time.time(), 3),
+            "word": word,
+            "score": score,
+            "text_prob": round(text_prob, 6),
+            "canvas": [strokes.width, strokes.height],
+            "strokes": [{"xy": encode_deltas(points, "h"), "t": encode_deltas(times, "i")}
+                        for points, times in zip(strokes.strokes, strokes.times)]
+        }
+        if player is not None:
+            record["player"] = player  # 함께 그리기에서 몇 번째 친구의 그림인지 (0부터)
+        self.file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self.file.flush()
+
+        self.unsynced += 1
+        if self.unsynced >= FSYNC_EVERY or time.monotonic() - self.last_sync >= FSYNC_INTERVAL:
+            self.sync()
+
+    def sync(self):
+        if self.unsynced:
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.flush()
+            self.sync()
+            self.file.close()
+
+
+class BackgroundArchive:
+    # 기록(특히 fsync)은 별도 스레드에서 -> 느린 디스크에서도 결과 팝업 직전에 화면이 멈추지 않음
+    # append에 넘긴 획은 그 뒤로 바꾸지 않아야 함 (제출할 때 만든 복사본을 넘김)
+    def __init__(self, archive):
+        self.archive = archive
+        self.records = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def append(self, *args, **kwargs):
+        self.records.put((args, kwargs))
+
+    def run(self):
+        while True:
+            record = self.records.get()
+            if record is None:
+                break
+            args, kwargs = record
+            try:
+                self.archive.append(*args, **kwargs)
+            except OSError as e:
+                print(f"그림 기록 실패: {e}")
+        self.archive.close()
+
+    def close(self, timeout=5.0):
+        # 쌓인 기록을 마저 쓰고 닫음 (디스크가 너무 느리면 timeout초만 기다리고 종료)
+        self.records.put(None)
+        self.thread.join(timeout)
+
+
+# ====== 읽기 ======
+def read_archive(path):
+    # 파일 전체를 읽지 않고 한 줄씩 기록을 돌려줌 (마지막 줄이 덜 써졌으면 건너뜀)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def load_strokes(record):
+    # 기록 하나 -> StrokeStore (다시 그려서 재채점할 때 사용)
+    width, height = record["canvas"]
+    strokes = StrokeStore(width, height)
+    for stroke in record["strokes"]:
+        points = decode_deltas(stroke["xy"], "h")
+        times = decode_deltas(stroke["t"], "i")
+        strokes.start_stroke(points[0], points[1], times[0])
+        for i in range(1, len(times)):
+            strokes.add_point(points[2 * i], points[2 * i + 1], times[i])
+    return strokes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="그림 기록 파일 요약 보기")
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    for record in read_archive(args.path):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record["time"]))
+        print(f"{stamp} [{record['session']}] {record['word']}: {record['score']}점 "
+              f"(글씨 {record['text_prob']:.2f}, 획 {len(record['strokes'])}개)")
+
+
+if __name__ == "__main__":
+    main()
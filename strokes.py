@@ -0,0 +1,128 @@
+import math
+import time
+from array import array
+from PIL import Image, ImageDraw
+from preprocess import CLIP_SIZE, crop_box
+
+# ====== 선 설정 ======
+STROKE_WIDTH = 5
+SUPERSAMPLE = 2  # 작게 그릴 때 2배로 그린 뒤 줄여서 계단 현상을 줄임
+
+# ====== 채점할 필요가 없는 그림 기준 (실수로 톡 친 경우 등) ======
+TRIVIAL_MIN_INK = 400  # 잉크 픽셀 수(선 길이 x 두께 추정)가 이보다 적으면 점 수준
+TRIVIAL_MIN_SIDE = 30  # 그린 영역의 가로, 세로가 모두 이보다 작으면 점 수준 (px)
+STRAIGHT_LINE_RATIO = 0.97  # 획 하나의 (시작-끝 거리 / 선 길이)가 이 이상이면 직선 하나
+
+
+class StrokeStore:
+    # 획마다 좌표를 array('h')에 x0, y0, x1, y1, ... 순서로 쌓아둠
+    # 점마다 시각(첫 점 기준 ms)도 array('i')에 같이 기록
+    # 입력 중에는 좌표만 기록하고, 비트맵은 채점할 때 필요한 크기로 한 번만 그림
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.strokes = []
+        self.times = []
+        self.t0 = None  # 첫 점의 시각 (ms)
+        self.bbox = None  # 지금까지 그린 선의 영역 (x0, y0, x1, y1)
+
+    def elapsed(self, t):
+        # t: Tk 이벤트의 event.time (ms), 없으면 현재 시각
+        if t is None:
+            t = int(time.monotonic() * 1000)
+        if self.t0 is None:
+            self.t0 = t
+        return t - self.t0
+
+    def start_stroke(self, x, y, t=None):
+        self.strokes.append(array("h", (x, y)))
+        self.times.append(array("i", (self.elapsed(t),)))
+
+    def add_point(self, x, y, t=None):
+        points = self.strokes[-1]
+        last_x, last_y = points[-2], points[-1]
+        points.extend((x, y))
+        self.times[-1].append(self.elapsed(t))
+
+        # 선 두께의 절반만큼 넓혀서 기록
+        half = STROKE_WIDTH // 2 + 1
+        x0, y0 = min(last_x, x) - half, min(last_y, y) - half
+        x1, y1 = max(last_x, x) + half, max(last_y, y) + half
+        if self.bbox is not None:
+            bx0, by0, bx1, by1 = self.bbox
+            x0, y0, x1, y1 = min(x0, bx0), min(y0, by0), max(x1, bx1), max(y1, by1)
+        self.bbox = (x0, y0, x1, y1)
+
+    def clear(self):
+        self.strokes = []
+        self.times = []
+        self.t0 = None
+        self.bbox = None
+
+    def copy(self):
+        # 채점 스레드에 넘길 스냅샷 (이후에 그리는 선은 반영되지 않음)
+        snapshot = StrokeStore(self.width, self.height)
+        snapshot.strokes = [array("h", points) for points in self.strokes]
+        snapshot.times = [array("i", times) for times in self.times]
+        snapshot.t0 = self.t0
+        snapshot.bbox = self.bbox
+        return snapshot
+
+    def lines(self):
+        # 실제로 선이 그려진 획만 (점 하나짜리 획은 제외)
+        return [points for points in self.strokes if len(points) >= 4]
+
+    # ====== 빈 그림 / 점 / 직선 하나 판별 ======
+    def trivial_reason(self):
+        # 모델 없이 바로 최저점을 줄 수 있는 그림이면 이유("blank", "dot", "line"), 아니면 None
+        lines = self.lines()
+        if not lines:
+            return "blank"
+
+        lengths = [stroke_length(points) for points in lines]
+        ink = sum(lengths) * STROKE_WIDTH
+        x0, y0, x1, y1 = self.bbox
+        if ink < TRIVIAL_MIN_INK or (x1 - x0 < TRIVIAL_MIN_SIDE and y1 - y0 < TRIVIAL_MIN_SIDE):
+            return "dot"
+
+        if len(lines) == 1:
+            points = lines[0]
+            chord = math.hypot(points[-2] - points[0], points[-1] - points[1])
+            if chord >= STRAIGHT_LINE_RATIO * lengths[0]:
+                return "line"
+        return None
+
+    # ====== 래스터화 ======
+    def render_full(self):
+        # 캔버스 전체 크기 그대로 (CLIPProcessor 경로용)
+        return self.render((0, 0, self.width, self.height), (self.width, self.height), 1.0, (0, 0))
+
+    def render_square(self, size=CLIP_SIZE):
+        # 그린 영역만 잘라서 size x size 흰 바탕 가운데에 그림 (preprocess.letterbox와 같은 배치)
+        box = crop_box(self.bbox, self.width, self.height)
+        box_w, box_h = box[2] - box[0], box[3] - box[1]
+        scale = size / max(box_w, box_h)
+        offset = ((size - round(box_w * scale)) // 2, (size - round(box_h * scale)) // 2)
+        return self.render(box, (size, size), scale, offset)
+
+    def render(self, box, out_size, scale, offset):
+        # box 영역의 선을 scale배 해서 offset 위치에 그림 (SUPERSAMPLE배로 그린 뒤 줄임)
+        factor = SUPERSAMPLE if scale < 1 else 1
+        image = Image.new("RGB", (out_size[0] * factor, out_size[1] * factor), "white")
+        draw = ImageDraw.Draw(image)
+        s = scale * factor
+        ox, oy = offset[0] * factor - box[0] * s, offset[1] * factor - box[1] * s
+        width = max(1, round(STROKE_WIDTH * s))
+
+        for points in self.lines():
+            xy = [(points[i] * s + ox, points[i + 1] * s + oy) for i in range(0, len(points), 2)]
+            draw.line(xy, fill="black", width=width, joint="curve")
+
+        if factor > 1:
+            image = image.reduce(factor)
+        return image
+
+
+def stroke_length(points):
+    return sum(math.hypot(points[i + 2] - points[i], points[i + 3] - points[i + 1])
+               for i in range(0, len(points) - 2, 2))
@@ -0,0 +1,110 @@
+import math
+import random
+import zlib
+from prompts import ALL_PROMPTS, PROMPT_MAP
+from strokes import StrokeStore
+
+# ====== 벤치마크, 점수 비교용 합성 그림 ======
+# 같은 버전이면 어느 PC에서 만들어도 똑같은 획이 나옴 (시드는 제시어 이름에서 계산)
+# 그리는 방식을 바꾸면 CORPUS_VERSION을 올려서 예전 결과와 비교하지 않게 함
+CORPUS_VERSION = 1
+CANVAS_SIZE = (900, 600)
+POINT_INTERVAL_MS = 8  # 점 사이 시간 (마우스 이벤트 간격 흉내)
+
+
+def word_seed(word, salt=""):
+    # hash()는 실행할 때마다 달라지므로 crc32 사용
+    return zlib.crc32(f"{CORPUS_VERSION}:{salt}:{word}".encode("utf-8"))
+
+
+def add_stroke(strokes, points, t):
+    # points: (x, y) 목록 -> 캔버스 안 정수 좌표로 기록, 마지막 시각을 돌려줌
+    clamped = [(min(max(int(round(x)), 0), strokes.width - 1), min(max(int(round(y)), 0), strokes.height - 1))
+               for x, y in points]
+    strokes.start_stroke(*clamped[0], t)
+    for x, y in clamped[1:]:
+        t += POINT_INTERVAL_MS
+        strokes.add_point(x, y, t)
+    return t + 200  # 다음 획까지 펜을 드는 시간
+
+
+def wobbly_loop(rng, cx, cy, rx, ry, steps=60):
+    # 손으로 그린 듯 울퉁불퉁한 닫힌 곡선
+    lobes = rng.randint(2, 6)
+    phase = rng.uniform(0, 2 * math.pi)
+    depth = rng.uniform(0.05, 0.25)
+    points = []
+    for i in range(steps + 1):
+        a = 2 * math.pi * i / steps
+        r = 1 + depth * math.sin(lobes * a + phase) + rng.uniform(-0.02, 0.02)
+        points.append((cx + rx * r * math.cos(a), cy + ry * r * math.sin(a)))
+    return points
+
+
+def wobbly_line(rng, x0, y0, x1, y1, steps=20, bend=0.2):
+    # 살짝 휘어진 선 (다리, 꼬리, 손잡이 같은 부분)
+    length = math.hypot(x1 - x0, y1 - y0)
+    nx, ny = (-(y1 - y0) / length, (x1 - x0) / length) if length else (0, 0)
+    amount = rng.uniform(-bend, bend) * length
+    points = []
+    for i in range(steps + 1):
+        s = i / steps
+        offset = amount * math.sin(math.pi * s) + rng.uniform(-1.5, 1.5)
+        points.append((x0 + (x1 - x0) * s + nx * offset, y0 + (y1 - y0) * s + ny * offset))
+    return points
+
+
+def make_sketch(word, size=CANVAS_SIZE):
+    # 몸통 하나 + 안쪽 무늬 + 바깥으로 뻗은 선 몇 개로 된 그림
+    rng = random.Random(word_seed(word, "sketch"))
+    width, height = size
+    strokes = StrokeStore(width, height)
+    cx, cy = width / 2 + rng.uniform(-120, 120), height / 2 + rng.uniform(-60, 60)
+    rx, ry = rng.uniform(90, 200), rng.uniform(70, 160)
+
+    t = add_stroke(strokes, wobbly_loop(rng, cx, cy, rx, ry), 0)
+    for _ in range(rng.randint(1, 3)):
+        sx, sy = cx + rng.uniform(-0.5, 0.5) * rx, cy + rng.uniform(-0.5, 0.5) * ry
+        t = add_stroke(strokes, wobbly_loop(rng, sx, sy, rx * rng.uniform(0.1, 0.3), ry * rng.uniform(0.1, 0.3),
+                                            steps=24), t)
+    for _ in range(rng.randint(2, 5)):
+        a = rng.uniform(0, 2 * math.pi)
+        x0, y0 = cx + rx * math.cos(a), cy + ry * math.sin(a)
+        reach = rng.uniform(40, 120)
+        t = add_stroke(strokes, wobbly_line(rng, x0, y0, x0 + reach * math.cos(a), y0 + reach * math.sin(a)), t)
+    return strokes
+
+
+def make_handwriting(text, size=CANVAS_SIZE):
+    # 필기체처럼 글자마다 고리를 그리며 이어 쓴 글씨 (글씨 페널티 확인용)
+    rng = random.Random(word_seed(text, "handwriting"))
+    width, height = size
+    strokes = StrokeStore(width, height)
+    letter_w = min(60, (width - 200) / max(1, len(text)))
+    x, baseline = 100 + rng.uniform(0, 40), height / 2 + rng.uniform(-40, 40)
+    t = 0
+    for word in text.split():
+        points = []
+        for _ in word:
+            h = rng.uniform(0.6, 1.4) * letter_w
+            for i in range(13):
+                a = 2 * math.pi * i / 12
+                points.append((x + letter_w * i / 12 - 0.3 * letter_w * math.sin(a),
+                               baseline - h * 0.5 * (1 - math.cos(a)) + rng.uniform(-1, 1)))
+            x += letter_w
+        t = add_stroke(strokes, points, t)
+        x += letter_w * 0.8
+    return strokes
+
+
+def synthetic_corpus(words=None, handwriting=True, size=CANVAS_SIZE):
+    # (이름, 제시어(한국어), StrokeStore) 목록
+    # 제시어마다 그림 하나 + 영어 단어를 글씨로 쓴 것 하나, 맨 앞에 빈 종이
+    if words is None:
+        words = ALL_PROMPTS
+    corpus = [("blank", words[0], StrokeStore(*size))]
+    for word in words:
+        corpus.append((f"sketch-{word}", word, make_sketch(word, size)))
+        if handwriting:
+            corpus.append((f"text-{word}", word, make_handwriting(PROMPT_MAP.get(word, "object"), size)))
+    return corpus
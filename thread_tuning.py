@@ -0,0 +1,264 @@
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+# ====== CPU 스레드 수 자동 조정 ======
+# PC마다(2코어 ~ 16코어) 그림 한 장을 채점하는 시간이 가장 짧은 스레드 설정을 한 번 재서
+# cache/threads/<호스트 이름>_<백엔드>_<전처리>.json 에 저장하고, 다음 실행부터 모델을 불러오기 전에 적용
+# intra-op: 연산 하나(행렬 곱 등)를 나눠 돌리는 스레드, inter-op: 서로 다른 연산을 동시에 돌리는 스레드
+# torch, int8: torch 스레드 수 (inter-op은 프로세스마다 병렬 작업 전에 한 번만 정할 수 있으므로 값마다 새 프로세스에서 잼)
+# onnx: ONNX Runtime 세션의 스레드 수 (torch 설정을 따르지 않으므로 설정마다 세션을 새로 만들어 잼)
+TUNING_DIR = os.path.join("cache", "threads")
+TUNING_VERSION = 2  # 저장 형식이나 재는 방식이 바뀌면 올림 (예전 결과는 무시하고 다시 잼)
+TUNE_WORD = "고양이"
+TUNE_ROUNDS = 7  # 설정마다 채점 횟수 (중앙값으로 비교)
+TUNE_WARMUP = 2  # 재기 전에 먼저 돌려보는 횟수
+TUNE_TIMEOUT = 900  # 하위 프로세스 하나(모델 로딩 + 측정)가 이보다 오래 걸리면 포기 (초)
+
+
+def profile_path(backend="torch", preprocess="crop", tuning_dir=TUNING_DIR, host=None):
+    # 백엔드나 전처리가 다르면 가장 빠른 설정도 다르므로 파일을 따로 둠
+    host = host or socket.gethostname() or "unknown"
+    name = re.sub(r"[^A-Za-z0-9._-]", "_", f"{host}_{backend}_{preprocess}")
+    return os.path.join(tuning_dir, name + ".json")
+
+
+def load_profile(backend="torch", preprocess="crop", tuning_dir=TUNING_DIR):
+    # 형식이 다르거나, 코어 수가 바뀐 PC(하드웨어 교체)거나, 다른 백엔드/전처리로 잰 결과면 None -> 다시 재야 함
+    try:
+        with open(profile_path(backend, preprocess, tuning_dir), encoding="utf-8") as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if profile.get("version") != TUNING_VERSION or profile.get("cpu_count") != os.cpu_count():
+        return None
+    if profile.get("backend") != backend or profile.get("preprocess") != preprocess:
+        return None
+    return profile
+
+
+def save_profile(profile, tuning_dir=TUNING_DIR):
+    path = profile_path(profile["backend"], profile["preprocess"], tuning_dir)
+    os.makedirs(tuning_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def apply_interop(profile):
+    # torch inter-op 스레드는 프로세스 전체에 하나 -> torch를 불러온 직후(모델 로딩, 첫 채점 전)에 한 번 호출
+    if profile["backend"] == "onnx":
+        return  # ONNX Runtime은 세션을 만들 때 정함 (onnx_threads)
+    import torch
+
+    try:
+        torch.set_num_interop_threads(profile["interop"])
+    except RuntimeError:
+        # 이미 병렬 작업을 시작한 프로세스에서는 바꿀 수 없음
+        print(f"inter-op 스레드 수는 이미 정해져 있어 그대로 사용합니다 ({torch.get_num_interop_threads()})")
+
+
+def apply_threads(profile):
+    # torch intra-op 스레드 수는 호출한 스레드에 적용되므로 채점하는 스레드에서 호출해야 함
+    if profile["backend"] == "onnx":
+        return
+    import torch
+
+    torch.set_num_threads(profile["threads"])
+
+
+def onnx_threads(profile):
+    # ClipScorer(threads=, interop=)에 넘길 ONNX Runtime 스레드 수 (onnx 설정이 아니면 기본값 그대로)
+    if profile is None or profile["backend"] != "onnx":
+        return None, None
+    return profile["threads"], profile["interop"]
+
+
+# ====== 후보 설정 ======
+def candidate_threads(cores=None):
+    # 1, 2, 4, 8 ... + 코어 절반, 전체, 하나 빼고 전체 (게임 화면과 음악에 코어 하나를 남겨두는 경우)
+    cores = cores or os.cpu_count() or 1
+    counts = {1, max(1, cores // 2), max(1, cores - 1), cores}
+    n = 2
+    while n < cores:
+        counts.add(n)
+        n *= 2
+    return sorted(counts)
+
+
+def candidate_interop(cores=None, backend="torch"):
+    # ONNX Runtime은 기본(순차 실행)에서 inter-op 스레드를 쓰지 않으므로 1만 잼
+    cores = cores or os.cpu_count() or 1
+    return [1, 2] if cores > 1 and backend != "onnx" else [1]
+
+
+# ====== 측정 ======
+def measure_threads(scorer, drawing, thread_counts, preprocess="crop", rounds=TUNE_ROUNDS, warmup=TUNE_WARMUP,
+                    configure=None):
+    # 같은 그림 한 장을 스레드 수마다 채점 (calculate_ai_score와 같은 순서) -> 스레드 수별 시간(ms)
+    # configure(threads): 스레드 수를 바꾸는 함수 (기본: 이 스레드의 torch intra-op 스레드 수)
+    import torch
+    from benchmark import score_drawings
+
+    if configure is None:
+        configure = torch.set_num_threads
+    results = []
+    for threads in thread_counts:
+        configure(threads)
+        for _ in range(warmup):
+            score_drawings(scorer, [drawing], preprocess)
+        latencies = []
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            score_drawings(scorer, [drawing], preprocess)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        results.append({"threads": threads, "median_ms": round(statistics.median(latencies), 3),
+                        "min_ms": round(min(latencies), 3), "max_ms": round(max(latencies), 3)})
+    return results
+
+
+def measure_main(args):
+    # 하위 프로세스: inter-op 스레드 수를 먼저 정하고 모델을 불러와 intra-op 후보를 전부 잼, 결과는 마지막 줄 JSON
+    import torch
+
+    if args.backend != "onnx":
+        torch.set_num_interop_threads(args.interop)
+    from ai_scorer import CACHE_DIR, ClipScorer, MODEL_NAME
+    from inference_backends import make_backend
+    from prompts import PROMPT_MAP
+    from synthetic import make_sketch
+    from transformers import CLIPProcessor, CLIPModel
+
+    model_name = args.model or MODEL_NAME
+    model = CLIPModel.from_pretrained(model_name)
+    processor = CLIPProcessor.from_pretrained(model_name)
+    # 게임과 같은 제시어 목록 -> 이미 만들어 둔 텍스트 임베딩을 그대로 읽음
+    scorer = ClipScorer(model, processor, PROMPT_MAP.values(), model_name, args.backend, CACHE_DIR,
+                        args.preprocess, cache=False)
+
+    configure = None
+    if args.backend == "onnx":
+        def configure(threads):
+            scorer.backend = make_backend("onnx", model, model_name, CACHE_DIR, threads, args.interop)
+
+    drawing = ("sketch", TUNE_WORD, make_sketch(TUNE_WORD))
+    results = measure_threads(scorer, drawing, args.threads, args.preprocess, args.rounds, args.warmup, configure)
+    for result in results:
+        result["interop"] = args.interop
+    print(json.dumps(results))
+
+
+def run_sweep(interop, thread_counts, backend="torch", preprocess="crop", rounds=TUNE_ROUNDS, warmup=TUNE_WARMUP,
+              model_name=None):
+    command = [sys.executable, os.path.abspath(__file__), "measure", "--interop", str(interop),
+               "--threads", *map(str, thread_counts), "--backend", backend, "--preprocess", preprocess,
+               "--rounds", str(rounds), "--warmup", str(warmup)]
+    if model_name:
+        command += ["--model", model_name]
+    done = subprocess.run(command, capture_output=True, text=True, timeout=TUNE_TIMEOUT)
+    if done.returncode != 0:
+        raise RuntimeError(f"스레드 측정 실패 (inter-op {interop}): {done.stderr.strip()[-500:]}")
+    return json.loads(done.stdout.strip().splitlines()[-1])
+
+
+def tune(backend="torch", preprocess="crop", thread_counts=None, interop_counts=None, rounds=TUNE_ROUNDS,
+         warmup=TUNE_WARMUP, model_name=None, tuning_dir=TUNING_DIR):
+    # 모든 조합을 재서 가장 빠른 설정을 이 PC의 설정으로 저장
+    if thread_counts is None:
+        thread_counts = candidate_threads()
+    if interop_counts is None:
+        interop_counts = candidate_interop(backend=backend)
+
+    results = []
+    for interop in interop_counts:
+        for result in run_sweep(interop, thread_counts, backend, preprocess, rounds, warmup, model_name):
+            print(format_result(result))
+            results.append(result)
+    best = min(results, key=lambda result: result["median_ms"])
+
+    import torch
+
+    profile = {
+        "version": TUNING_VERSION,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": socket.gethostname(),
+        "cpu_count": os.cpu_count(),
+        "torch": torch.__version__,
+        "backend": backend,
+        "preprocess": preprocess,
+        "threads": best["threads"],
+        "interop": best["interop"],
+        "median_ms": best["median_ms"],
+        "results": results
+    }
+    path = save_profile(profile, tuning_dir)
+    print(f"가장 빠른 설정: 스레드 {best['threads']}, inter-op {best['interop']} ({best['median_ms']:.1f} ms) -> {path}")
+    return profile
+
+
+def tune_in_subprocess(backend="torch", preprocess="crop", model_name=None):
+    # 게임 프로세스의 inter-op 설정은 한 번만 정할 수 있으므로 측정은 전부 별도 프로세스에서 (결과만 읽어옴)
+    command = [sys.executable, os.path.abspath(__file__), "tune", "--backend", backend, "--preprocess", preprocess]
+    if model_name:
+        command += ["--model", model_name]
+    done = subprocess.run(command, capture_output=True, text=True)
+    if done.returncode != 0:
+        print(f"스레드 설정 측정 실패: {done.stderr.strip()[-500:]}")
+        return None
+    return load_profile(backend, preprocess)
+
+
+def format_result(result):
+    return (f"[스레드 {result['threads']:2d} | inter-op {result['interop']}] "
+            f"중앙값 {result['median_ms']:8.1f} ms  (최소 {result['min_ms']:.1f}, 최대 {result['max_ms']:.1f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이 PC에서 채점이 가장 빠른 스레드 수를 재서 저장")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    tune_parser = sub.add_parser("tune", help="다시 재서 저장")
+    tune_parser.add_argument("--threads", nargs="+", type=int, default=None, help="intra-op 후보 (기본: 코어 수에 맞춰)")
+    tune_parser.add_argument("--interop", nargs="+", type=int, default=None,
+                             help="inter-op 후보 (기본: 1, 2, onnx는 1)")
+
+    measure = sub.add_parser("measure", help="(내부용) inter-op 하나로 intra-op 후보를 잼")
+    measure.add_argument("--threads", nargs="+", type=int, required=True)
+    measure.add_argument("--interop", type=int, required=True)
+
+    show = sub.add_parser("show", help="저장된 설정 보기")
+
+    for p in (tune_parser, measure, show):
+        p.add_argument("--backend", default="torch", help="torch, int8, onnx")
+        p.add_argument("--preprocess", default="crop", choices=["crop", "processor"])
+    for p in (tune_parser, measure):
+        p.add_argument("--rounds", type=int, default=TUNE_ROUNDS)
+        p.add_argument("--warmup", type=int, default=TUNE_WARMUP)
+        p.add_argument("--model", default=None, help="모델 이름 또는 로컬 폴더")
+    args = parser.parse_args()
+
+    if args.command == "measure":
+        measure_main(args)
+    elif args.command == "tune":
+        tune(args.backend, args.preprocess, args.threads, args.interop, args.rounds, args.warmup, args.model)
+    else:
+        profile = load_profile(args.backend, args.preprocess)
+        if profile is None:
+            print(f"저장된 설정이 없습니다 ({profile_path(args.backend, args.preprocess)}). tune으로 재세요.")
+            return
+        print(f"{profile['host']} ({profile['cpu_count']}코어, {profile['backend']}, {profile['time']}): "
+              f"스레드 {profile['threads']}, inter-op {profile['interop']} ({profile['median_ms']:.1f} ms)")
+        for result in profile["results"]:
+            print("  " + format_result(result))
+
+
+if __name__ == "__main__":
+    main()